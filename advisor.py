@@ -0,0 +1,842 @@
+import os
+import threading
+import numpy as np
+from typing import List, Dict, Mapping, Tuple, NamedTuple, Optional, Sequence
+from types import MappingProxyType
+from cache import LRUCache, approx_size
+from catalog import CAREER_IDS, SKILL_IDS, Catalog, Match
+from engine import INTEREST_DAMPING, INTEREST_WEIGHT, SKILL_WEIGHT, IncrementalScorer, SkillMatrix, top_k
+from facets import Facets
+import index_store
+from kb import BuiltinSource, KnowledgeBase, Snapshot, open_source
+from metrics import METRICS
+from passages import PassageIndex, build_passage_index
+from planner import needs, plan
+from qa import QAIndex, build_count, build_qa_index
+from skills import SkillResolver
+
+# -----------------------------
+# Knowledge Base (Careers)
+# -----------------------------
+BUILTIN_CAREERS: Dict[str, Dict] = {
+    "Data Scientist": {
+        "skills": ["Python", "Machine Learning", "Statistics", "SQL"],
+        "description": "Data Scientists analyze data to extract insights and build predictive models.",
+        "roadmap": [
+            "Learn Python, SQL, and Statistics",
+            "Master data visualization (Matplotlib, Power BI, Tableau)",
+            "Study Machine Learning (Scikit-learn, TensorFlow, PyTorch)",
+            "Work on real-world datasets & Kaggle competitions",
+            "Intern as Data Analyst → Move to Data Scientist role"
+        ],
+        "salary": "₹6–20 LPA in India"
+    },
+    "Software Engineer": {
+        "skills": ["Java", "C++", "Python", "System Design"],
+        "description": "Software Engineers design, develop, and maintain applications and systems.",
+        "roadmap": [
+            "Master programming languages (C++, Java, Python)",
+            "Learn DSA & problem-solving (LeetCode, Codeforces)",
+            "Understand DBMS, OS, Computer Networks",
+            "Practice system design for scalability",
+            "Apply for SDE internships and jobs"
+        ],
+        "salary": "₹4–18 LPA in India"
+    },
+    "Cloud Engineer": {
+        "skills": ["Linux", "Networking", "GCP", "AWS", "Azure", "Docker", "Kubernetes"],
+        "description": "Cloud Engineers manage and deploy applications on cloud platforms.",
+        "roadmap": [
+            "Learn basics of Linux & Networking",
+            "Get certified in AWS/Azure/GCP",
+            "Master containers (Docker, Kubernetes)",
+            "Learn Infrastructure as Code (Terraform)",
+            "Work on deploying scalable apps"
+        ],
+        "salary": "₹5–16 LPA in India"
+    },
+    "UI/UX Designer": {
+        "skills": ["Figma", "Adobe XD", "Creativity", "User Research"],
+        "description": "UI/UX Designers create intuitive and visually appealing user interfaces.",
+        "roadmap": [
+            "Learn Figma/Adobe XD for design",
+            "Study design principles & color theory",
+            "Understand UX research & user psychology",
+            "Build a design portfolio",
+            "Apply for UI/UX internships"
+        ],
+        "salary": "₹3–12 LPA in India"
+    },
+    "Business Analyst": {
+        "skills": ["Excel", "SQL", "Data Visualization", "Problem Solving"],
+        "description": "Business Analysts analyze processes and suggest improvements using data insights.",
+        "roadmap": [
+            "Master Excel & SQL",
+            "Learn data visualization (Power BI, Tableau)",
+            "Understand business processes",
+            "Work on case studies & projects",
+            "Apply for BA internships"
+        ],
+        "salary": "₹4–14 LPA in India"
+    },
+    "AI Engineer": {
+        "skills": ["Python", "Deep Learning", "NLP", "TensorFlow", "PyTorch"],
+        "description": "AI Engineers build, train, and deploy intelligent systems and AI models.",
+        "roadmap": [
+            "Learn Python, Linear Algebra & Probability",
+            "Master Deep Learning frameworks (PyTorch/TensorFlow)",
+            "Work on NLP & Computer Vision projects",
+            "Understand MLOps for deploying AI models",
+            "Contribute to open-source AI projects"
+        ],
+        "salary": "₹6–25 LPA in India"
+    },
+    "DevOps Engineer": {
+        "skills": ["Linux", "AWS", "CI/CD", "Docker", "Kubernetes"],
+        "description": "DevOps Engineers automate deployment, integration, and system monitoring.",
+        "roadmap": [
+            "Learn Linux, Git, and Shell scripting",
+            "Understand CI/CD pipelines (Jenkins, GitHub Actions)",
+            "Master containers & orchestration (Docker, Kubernetes)",
+            "Learn cloud platforms (AWS/Azure/GCP)",
+            "Work on real-world DevOps projects"
+        ],
+        "salary": "₹5–18 LPA in India"
+    },
+    "Cybersecurity Analyst": {
+        "skills": ["Networking", "Ethical Hacking", "Security Tools", "Risk Management"],
+        "description": "Cybersecurity Analysts protect systems from cyber threats and vulnerabilities.",
+        "roadmap": [
+            "Learn Networking & Security fundamentals",
+            "Study firewalls, IDS/IPS, and encryption",
+            "Get certified (CEH, CompTIA Security+, CISSP)",
+            "Practice penetration testing & incident response",
+            "Work in SOC (Security Operations Center)"
+        ],
+        "salary": "₹4–15 LPA in India"
+    },
+    "Data Engineer": {
+        "skills": ["SQL", "Python", "ETL", "Big Data", "Spark"],
+        "description": "Data Engineers design and maintain systems that collect and process large datasets.",
+        "roadmap": [
+            "Learn SQL and Python for data processing",
+            "Understand ETL pipelines",
+            "Work with Hadoop, Spark, Kafka",
+            "Learn data warehousing (Snowflake, Redshift)",
+            "Work on real-world data engineering projects"
+        ],
+        "salary": "₹6–18 LPA in India"
+    },
+    "Full Stack Developer": {
+        "skills": ["JavaScript", "React", "Node.js", "Databases", "APIs"],
+        "description": "Full Stack Developers work on both frontend and backend of web applications.",
+        "roadmap": [
+            "Learn HTML, CSS, JavaScript",
+            "Master frontend frameworks (React, Angular, Vue)",
+            "Learn backend with Node.js/Django/Flask",
+            "Understand REST APIs & Databases",
+            "Build and deploy full-stack projects"
+        ],
+        "salary": "₹4–16 LPA in India"
+    },
+    "Mobile App Developer": {
+        "skills": ["Flutter", "React Native", "Java", "Kotlin", "Swift"],
+        "description": "Mobile Developers build apps for Android and iOS platforms.",
+        "roadmap": [
+            "Learn Java/Kotlin for Android, Swift for iOS",
+            "Explore cross-platform frameworks (Flutter, React Native)",
+            "Understand UI/UX for mobile apps",
+            "Practice app deployment on Play Store/App Store",
+            "Work on real-world mobile projects"
+        ],
+        "salary": "₹3–14 LPA in India"
+    },
+    "Product Manager": {
+        "skills": ["Communication", "Business Strategy", "Agile", "Market Research"],
+        "description": "Product Managers lead product development and align business strategy with tech solutions.",
+        "roadmap": [
+            "Learn basics of business & product development",
+            "Understand Agile & Scrum methodologies",
+            "Work on product case studies",
+            "Develop communication & leadership skills",
+            "Apply for Associate PM roles"
+        ],
+        "salary": "₹8–30 LPA in India"
+    },
+    "QA Engineer": {
+        "skills": ["Manual Testing", "Automation Testing", "Selenium", "JMeter"],
+        "description": "QA Engineers ensure the quality of software by testing and reporting bugs.",
+        "roadmap": [
+            "Learn manual testing & test case writing",
+            "Understand SDLC & STLC",
+            "Master automation tools (Selenium, Cypress)",
+            "Learn performance testing (JMeter, LoadRunner)",
+            "Apply for QA roles"
+        ],
+        "salary": "₹3–12 LPA in India"
+    },
+    "Game Developer": {
+        "skills": ["Unity", "C#", "C++", "Game Design", "3D Modeling"],
+        "description": "Game Developers design and develop interactive video games for various platforms.",
+        "roadmap": [
+            "Learn game engines (Unity, Unreal)",
+            "Practice programming with C#/C++",
+            "Understand graphics, physics & AI in games",
+            "Build indie game projects",
+            "Apply to gaming studios"
+        ],
+        "salary": "₹4–15 LPA in India"
+    },
+    "Blockchain Developer": {
+        "skills": ["Solidity", "Ethereum", "Smart Contracts", "Cryptography"],
+        "description": "Blockchain Developers create decentralized applications and smart contracts.",
+        "roadmap": [
+            "Learn blockchain basics & cryptography",
+            "Master Solidity & Ethereum",
+            "Understand smart contracts & DApps",
+            "Work on blockchain projects",
+            "Contribute to Web3 open-source"
+        ],
+        "salary": "₹6–20 LPA in India"
+    },
+    "AR/VR Developer": {
+        "skills": ["Unity", "C#", "3D Modeling", "ARKit", "ARCore"],
+        "description": "AR/VR Developers build immersive augmented and virtual reality applications.",
+        "roadmap": [
+            "Learn Unity/Unreal for AR/VR",
+            "Understand 3D modeling (Blender, Maya)",
+            "Practice ARKit (iOS) & ARCore (Android)",
+            "Build AR/VR projects",
+            "Apply for AR/VR developer jobs"
+        ],
+        "salary": "₹5–18 LPA in India"
+    },
+    "IT Support Specialist": {
+        "skills": ["Troubleshooting", "Networking", "Windows/Linux", "Customer Support"],
+        "description": "IT Support Specialists provide technical assistance and solve hardware/software issues.",
+        "roadmap": [
+            "Learn computer hardware & OS basics",
+            "Understand networking & troubleshooting",
+            "Get certified (CompTIA A+, CCNA)",
+            "Work in helpdesk or IT support roles",
+            "Grow into system admin/network engineer"
+        ],
+        "salary": "₹2–8 LPA in India"
+    },
+    "Digital Marketer": {
+        "skills": ["SEO", "Google Ads", "Content Marketing", "Analytics"],
+        "description": "Digital Marketers promote businesses online using SEO, paid ads, and social media.",
+        "roadmap": [
+            "Learn SEO & SEM fundamentals",
+            "Master social media marketing",
+            "Understand Google Analytics & Ads",
+            "Work on campaigns & content marketing",
+            "Apply for digital marketing jobs"
+        ],
+        "salary": "₹3–10 LPA in India"
+    },
+    # From your earlier FastAPI roles:
+    "Data Analyst": {
+        "skills": ["SQL", "Excel", "Python", "Data Visualization", "Statistics"],
+        "description": "Analyze data using SQL, Excel, Python; build dashboards and insights.",
+        "roadmap": [
+            "Master SQL (joins, window functions)",
+            "Learn Excel advanced (pivots, charts, formulas)",
+            "Use Python for data wrangling (pandas, numpy)",
+            "Learn BI tools (Power BI/Tableau)",
+            "Build dashboards and publish portfolio"
+        ],
+        "salary": "₹3.5–7 LPA in India"
+    },
+    "Product Analyst": {
+        "skills": ["SQL", "A/B Testing", "Product Metrics", "Data Visualization"],
+        "description": "Use product metrics and experimentation to inform roadmap decisions.",
+        "roadmap": [
+            "Learn core product metrics (retention, WAU/MAU, funnels)",
+            "Study A/B testing design & analysis",
+            "Query data with SQL",
+            "Build dashboards and run experiments",
+            "Partner with PMs to drive insights"
+        ],
+        "salary": "₹5–9 LPA in India"
+    },
+    "Cloud Support Associate": {
+        "skills": ["Linux", "Networking", "GCP Core", "Scripting", "Customer Support"],
+        "description": "Provide technical support for cloud services; troubleshoot infra issues.",
+        "roadmap": [
+            "Learn Linux & basic networking",
+            "Study GCP/AWS fundamentals (cloud concepts)",
+            "Practice scripting (Bash/Python)",
+            "Understand ticketing & troubleshooting playbooks",
+            "Prepare for Cloud Digital Leader/Cloud Practitioner"
+        ],
+        "salary": "₹3–6 LPA in India"
+    },
+    "Junior ML Engineer": {
+        "skills": ["Python", "ML Basics", "Data Pipelines", "GCP Vertex AI", "Docker"],
+        "description": "Build and deploy ML models; data pipelines; evaluate metrics.",
+        "roadmap": [
+            "Master Python & ML (scikit-learn, model eval)",
+            "Build ETL/data pipelines",
+            "Containerize with Docker",
+            "Deploy simple models (FastAPI/Vertex AI endpoints)",
+            "Track experiments & metrics"
+        ],
+        "salary": "₹6–12 LPA in India"
+    },
+}
+
+# Simple skill → free course hints
+BUILTIN_COURSES = {
+    "Python": ["Kaggle: Python", "freeCodeCamp: Python for Data"],
+    "SQL": ["Mode SQL Tutorial", "Khan Academy: SQL"],
+    "Statistics": ["Khan Academy: Statistics", "StatQuest on YouTube"],
+    "Machine Learning": ["Google ML Crash Course", "fast.ai Practical Deep Learning"],
+    "Data Visualization": ["Power BI Microsoft Learn", "Tableau Free Training"],
+    "Excel": ["ExcelJet", "Microsoft Learn: Excel"],
+    "Linux": ["Linux Journey", "Ubuntu Tutorials"],
+    "Networking": ["Cisco NetAcad Intro", "Professor Messer: Network+"],
+    "Docker": ["Docker Getting Started", "Kubernetes Basics"],
+    "Kubernetes": ["Kubernetes Docs Basics", "KodeKloud Free K8s Course"],
+    "React": ["react.dev Learn", "Scrimba React Free"],
+    "Node.js": ["nodejs.dev Learn", "The Odin Project: Node"],
+    "Flutter": ["Flutter.dev Docs", "AppBrewery Free Intro"],
+    "Java": ["JetBrains Academy Java Basics", "Oracle Java Tutorials"],
+    "C++": ["cppreference (Learn)", "freeCodeCamp: C++"],
+    "System Design": ["System Design Primer", "Grokking summaries"],
+    "NLP": ["Hugging Face Course", "fast.ai NLP"],
+    "Deep Learning": ["DeepLearning.AI Short Courses", "fast.ai"],
+    "Cybersecurity": ["TryHackMe Free Rooms", "OverTheWire Wargames"],
+}
+
+# -----------------------------
+# Knowledge base source
+# -----------------------------
+# Point ADVISOR_KB at a .json/.parquet/.sqlite file to serve careers from it
+# (see kb.py); the built-in catalog above is the default. CAREERS and
+# SKILL_COURSES always read through to the currently loaded version.
+def _open_kb() -> KnowledgeBase:
+    path = os.environ.get("ADVISOR_KB")
+    return KnowledgeBase(open_source(path) if path else BuiltinSource(BUILTIN_CAREERS, BUILTIN_COURSES))
+
+KB = _open_kb()
+CAREERS = KB.careers
+SKILL_COURSES = KB.courses
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def normalize(items: List[str]) -> List[str]:
+    return [i.strip().lower() for i in items if isinstance(i, str)]
+
+def score_match(user_skills: List[str], career_skills: List[str]) -> float:
+    u = set(normalize(user_skills))
+    r = set(normalize(career_skills))
+    if not r:
+        return 0.0
+    return len(u.intersection(r)) / len(r)
+
+def parse_list(text: str) -> List[str]:
+    return [s.strip() for s in (text or "").split(",") if s.strip()]
+
+# -----------------------------
+# Indexes derived from the KB
+# -----------------------------
+# Built once per process and shared by every session. A KB reload patches
+# them (only changed careers are re-interned / re-tokenized) and swaps the
+# whole tuple at once, so readers always see a consistent set.
+class Indexes(NamedTuple):
+    kb: Snapshot
+    catalog: Catalog
+    skills: SkillMatrix
+    resolver: SkillResolver
+    qa: Optional[QAIndex]
+    passages: Optional[PassageIndex]
+    facets: Optional[Facets]
+
+def _resolver(kb: Snapshot, skills: SkillMatrix) -> SkillResolver:
+    display: Dict[str, str] = {}
+    for career in kb.careers.values():
+        for s in career.skills:
+            display.setdefault(s.strip().lower(), s.strip())
+    return SkillResolver(skills.vocab, display)
+
+# Index builds and patches in this process (memory-mapped loads don't
+# count); exported as a metric and in the server's /health
+_builds = {"skill_matrix": 0, "passages": 0}
+_builds_lock = threading.Lock()
+
+def _count_build(index: str):
+    with _builds_lock:
+        _builds[index] += 1
+
+def index_builds() -> Dict[str, int]:
+    with _builds_lock:
+        return {**_builds, "qa": build_count()}
+
+# With ADVISOR_INDEX pointing at a directory written by
+# `python index_store.py build`, the skill matrix and Q&A index are
+# memory-mapped from it instead of fitted, as long as it was built for the
+# KB version being served. ADVISOR_INDEX_VERIFY=0 skips the file checksums.
+def _initial_indexes() -> Indexes:
+    kb = KB.snapshot
+    path = os.environ.get("ADVISOR_INDEX")
+    stored = index_store.load(path, kb.version, os.environ.get("ADVISOR_INDEX_VERIFY", "1") != "0") if path else None
+    if stored is not None:
+        skills, qa = stored
+    else:
+        skills, qa = SkillMatrix.from_careers(kb.careers, normalize), None
+        _count_build("skill_matrix")
+    return Indexes(kb, Catalog(kb), skills, _resolver(kb, skills), qa, None, None)
+
+_INDEXES = _initial_indexes()
+_index_lock = threading.Lock()
+
+@KB.on_reload
+def _patch_indexes(old: Snapshot, new: Snapshot):
+    global _INDEXES
+    with _index_lock:
+        cur = _INDEXES
+        changed = {
+            t: normalize(c.skills) for t, c in new.careers.items()
+            if t not in old.careers or old.careers[t].skills != c.skills
+        }
+        # Mostly-new catalogs are rebuilt so stale vocabulary doesn't pile up
+        rebuild = len(changed) > len(new.careers) // 2
+        if rebuild:
+            skills = SkillMatrix.from_careers(new.careers, normalize)
+        else:
+            skills = cur.skills.updated(list(new.careers), changed)
+        _count_build("skill_matrix")
+        qa = None
+        if cur.qa is not None:
+            docs, labels = _kb_docs(new)
+            qa = build_qa_index(docs, labels, new.version) if rebuild else cur.qa.updated(docs, labels, new.version)
+        passages = None
+        if cur.passages is not None:
+            new.details.prefetch(new.careers)
+            passages = build_passage_index(new.careers, new.courses, new.version, None if rebuild else cur.passages)
+            _count_build("passages")
+        # Facets are cheap to rebuild and need every salary, so they wait for the next filter
+        # (facet_indexes keys them by catalog)
+        _INDEXES = Indexes(new, Catalog(new), skills, _resolver(new, skills), qa, passages, None)
+        QA_CACHE.clear()
+        RESULT_CACHE.clear()
+
+def current_indexes() -> Indexes:
+    KB.refresh()
+    return _INDEXES
+
+# Filter bitmaps parse every career's salary, so they too are built on
+# first use (the first filtered recommendation). They are kept per catalog
+# under their own lock rather than in _INDEXES: taking _index_lock would
+# queue the first filter behind a Q&A or passage build it doesn't use.
+_facet_lock = threading.Lock()
+_facets: Tuple[Optional[Catalog], Optional[Facets]] = (None, None)
+
+def facet_indexes() -> Indexes:
+    global _facets
+    idx = current_indexes()
+    catalog, facets = _facets
+    if catalog is not idx.catalog:
+        with _facet_lock:
+            catalog, facets = _facets
+            if catalog is not idx.catalog:
+                facets = Facets(idx.catalog, idx.skills)
+                _facets = (idx.catalog, facets)
+    return idx._replace(facets=facets)
+
+def passage_indexes() -> Indexes:
+    # Same deal for the passage index, which also needs the Q&A index for
+    # fusion with the career scores
+    global _INDEXES
+    idx = qa_indexes()
+    if idx.passages is None:
+        with _index_lock:
+            idx = _INDEXES
+            if idx.passages is None:
+                idx.kb.details.prefetch(idx.kb.careers)
+                idx = _INDEXES = idx._replace(passages=build_passage_index(idx.kb.careers, idx.kb.courses, idx.kb.version))
+                _count_build("passages")
+    return idx
+
+def qa_indexes() -> Indexes:
+    # The Q&A index needs every description and roadmap (and scikit-learn),
+    # so it is only built the first time a question is asked, or by
+    # warm_qa_index() once the first page is on screen.
+    global _INDEXES
+    idx = current_indexes()
+    if idx.qa is None:
+        with _index_lock:
+            idx = _INDEXES
+            if idx.qa is None:
+                idx = _INDEXES = idx._replace(qa=build_qa_index(*_kb_docs(idx.kb), idx.kb.version))
+    return idx
+
+# When the Q&A stack is loaded: "background" (default) warms it in a thread
+# after the first render, "lazy" waits for the first question, "eager"
+# builds it at import like the original app did.
+QA_STARTUP = os.environ.get("ADVISOR_QA_STARTUP", "background")
+_warm_started = threading.Event()
+
+def warm_qa_index():
+    if QA_STARTUP != "background" or _warm_started.is_set():
+        return
+    _warm_started.set()
+    threading.Thread(target=passage_indexes, name="qa-warmup", daemon=True).start()
+
+# Recommendations are catalog.Match tuples (career id, match %, missing
+# skill ids): cheap to keep in every session's state. Text is looked up from
+# the current KB only when something is rendered or serialized.
+def career_title(m: Match) -> str:
+    return CAREER_IDS.name(m.career)
+
+def missed_skills(m: Match) -> List[str]:
+    return [SKILL_IDS.name(s) for s in m.missing]
+
+def describe(recommendations: List[Match]) -> List[Dict]:
+    # Full recommendation dicts (the original shape) for display or JSON.
+    # Careers dropped by a KB reload since the match was made are skipped.
+    kb = current_indexes().kb
+    titles = [career_title(m) for m in recommendations]
+    kb.details.prefetch([t for t in titles if t in kb.careers])
+    out = []
+    for title, m in zip(titles, recommendations):
+        info = kb.careers.get(title)
+        if info is None:
+            continue
+        out.append({
+            "career": title,
+            "match": m.match,
+            "description": info["description"],
+            "roadmap": info["roadmap"],
+            "salary": info["salary"],
+            "skills_missed": missed_skills(m),
+        })
+    return out
+
+def skill_choices() -> List[str]:
+    # Display names of every skill some career lists, for pickers
+    return sorted(current_indexes().resolver.display.values(), key=str.lower)
+
+def resolve_skills(items: List[str]) -> List[str]:
+    # Free text ("k8s", "ML", "Postgres SQL") → canonical normalized KB skills
+    return current_indexes().resolver.resolve_all(items or [])
+
+def explain_skills(items: List[str]) -> List[Tuple[str, str]]:
+    return current_indexes().resolver.explain(items or [])
+
+# A cohort submits the same few profiles over and over ("Python, SQL",
+# "python,sql ", "SQL, Python"), so results are cached process-wide under
+# the KB version plus the sorted, resolved skill and interest sets. Values
+# are tuples of Match (or read-only mappings) shared by every session, and
+# concurrent misses on one profile compute it once. The cache is cleared
+# on every KB reload; RESULT_CACHE.stats() has hit rate and approximate bytes.
+RESULT_CACHE = LRUCache(maxsize=int(os.environ.get("ADVISOR_RESULT_CACHE_SIZE", 8192)), sizeof=approx_size)
+
+def _profile_key(kb_version: str, skills: List[str], interests: List[str], filters: Tuple = ()) -> Tuple:
+    return ("recommend", kb_version, tuple(sorted(set(skills))), tuple(sorted(set(interests))), filters)
+
+@METRICS.timed("recommend_careers")
+def recommend_careers(name: str, skills: List[str], interests: List[str], min_salary: Optional[float] = None,
+                      domains: Optional[List[str]] = None,
+                      required_skills: Optional[List[str]] = None) -> Tuple[Match, ...]:
+    # Optional filters (see facets.py): careers whose salary range reaches
+    # min_salary LPA, in any of `domains`, listing every required skill.
+    # Only the careers passing them are scored.
+    idx = current_indexes()
+    user_skills = idx.resolver.resolve_all(skills)
+    user_interests = idx.resolver.resolve_all(interests or [])
+    # Decided after resolving, so blank required skills don't count as a filter
+    required = idx.resolver.resolve_all(required_skills or [])
+    filtered = bool(min_salary or domains or required)
+    if filtered:
+        idx = facet_indexes()
+    filters = (float(min_salary or 0), tuple(sorted(set(domains or ()))), tuple(sorted(set(required)))) if filtered else ()
+
+    def compute() -> Tuple[Match, ...]:
+        have = set(user_skills)
+        rows = idx.facets.select(min_salary, domains, required) if filtered else None
+        if rows is not None:
+            top = top_k(rows, idx.skills.score_rows(user_skills, user_interests, rows), k=10)
+        else:
+            top = idx.skills.top(idx.skills.score(user_skills, user_interests), k=10)
+        return tuple(idx.catalog.match(i, match, have) for i, match in top)
+
+    return RESULT_CACHE.get_or_compute(_profile_key(idx.kb.version, user_skills, user_interests, filters), compute)
+
+@METRICS.timed("recommend_careers_live")
+def recommend_careers_live(scorer: Optional[IncrementalScorer], skills: List[str],
+                           interests: List[str]) -> Tuple[IncrementalScorer, Tuple[Match, ...]]:
+    # Same result as recommend_careers, for a profile being edited: keep the
+    # returned scorer (e.g. in session state) and pass it back on the next
+    # edit so only the skills that changed are rescored. A scorer from
+    # before a KB reload is replaced. On a cache hit the scorer is left as
+    # is; it applies differences, so the next edit still scores correctly.
+    idx = current_indexes()
+    if scorer is None or scorer.skills is not idx.skills:
+        scorer = IncrementalScorer(idx.skills, k=10)
+    user_skills = idx.resolver.resolve_all(skills)
+    user_interests = idx.resolver.resolve_all(interests or [])
+
+    def compute() -> Tuple[Match, ...]:
+        scorer.update(user_skills, user_interests)
+        have = set(user_skills)
+        return tuple(idx.catalog.match(i, match, have) for i, match in scorer.top())
+
+    return scorer, RESULT_CACHE.get_or_compute(_profile_key(idx.kb.version, user_skills, user_interests), compute)
+
+@METRICS.timed("recommend_careers_batch")
+def recommend_careers_batch(profiles: List[Tuple[List[str], List[str]]]) -> List[Tuple[Match, ...]]:
+    # Same output as calling recommend_careers per (skills, interests) profile,
+    # but the profiles not in the result cache are scored together in one
+    # sparse matrix product (each distinct one once).
+    idx = current_indexes()
+    resolved = [(idx.resolver.resolve_all(skills), idx.resolver.resolve_all(interests or [])) for skills, interests in profiles]
+
+    def score(todo: List[int]) -> List[Tuple[Match, ...]]:
+        user_skills = [resolved[n][0] for n in todo]
+        scores = idx.skills.score_many(user_skills, [resolved[n][1] for n in todo])
+        return [tuple(idx.catalog.match(i, match, set(have)) for i, match in top)
+                for have, top in zip(user_skills, idx.skills.top_many(scores, k=10))]
+
+    return RESULT_CACHE.get_or_compute_many([_profile_key(idx.kb.version, s, i) for s, i in resolved], score)
+
+@METRICS.timed("next_skills")
+def next_skills(skills: List[str], interests: List[str], n: int = 5,
+                recommendations: Optional[List[Match]] = None, k: int = 10) -> List[Dict]:
+    # "Learn X next": the missing skills that would lift the profile's top
+    # matches the most, ranked by total match gain, from one sparse product
+    # over the catalog's incidence rows. Pass the profile's recommendations
+    # to skip rescoring; with no match at all, every career counts.
+    idx = current_indexes()
+    sm = idx.skills
+    user_skills = idx.resolver.resolve_all(skills)
+    if recommendations is None:
+        recommendations = recommend_careers("", skills, interests)
+    rows = np.array([idx.catalog.row_of[m.career] for m in recommendations[:k] if m.career in idx.catalog.row_of],
+                    dtype=np.int64)
+    matched = len(rows) > 0
+    gains = sm.skill_gains(rows if matched else None)
+    gains[[sm.vocab[s] for s in user_skills if s in sm.vocab]] = 0.0
+    cand = np.flatnonzero(gains > 0)
+    if len(cand) > n:
+        cand = cand[np.argpartition(-gains[cand], n - 1)[:n]]
+    # Biggest gain first; ties go to the skill more careers ask for
+    reach = sm.skill_reach()
+    cand = sorted(cand.tolist(), key=lambda j: (-gains[j], -reach[j], j))
+
+    before = sm.score_rows(user_skills, idx.resolver.resolve_all(interests or []), rows) if matched else None
+    vocab = list(sm.vocab)
+    out = []
+    for j in cand:
+        if matched:
+            lifted = [(i, before[r]) for r, i in enumerate(rows.tolist())
+                      if j in sm.matrix.indices[sm.matrix.indptr[i]:sm.matrix.indptr[i + 1]]]
+        else:
+            # Nothing matched yet: list the careers this skill lifts the most
+            rows_j = sm.careers_with(j)
+            lifted = [(i, 0.0) for i in rows_j[np.argsort(sm.row_len[rows_j], kind="stable")[:k]].tolist()]
+        careers = [(sm.titles[i], round(float(old) * 100, 1), round(float(old + SKILL_WEIGHT / sm.row_len[i]) * 100, 1))
+                   for i, old in lifted]
+        careers.sort(key=lambda c: c[1] - c[2])
+        out.append({
+            "skill": idx.resolver.display.get(vocab[j], vocab[j]),
+            "gain": round(float(gains[j]) * 100, 1),
+            "careers": careers,
+            "reach": int(reach[j]),
+        })
+    return out
+
+@METRICS.timed("plan_skills")
+def plan_skills(skills: List[str], targets: Optional[List[str]] = None, threshold: float = 1.0,
+                recommendations: Optional[List[Match]] = None, interests: Optional[List[str]] = None) -> Dict:
+    # Near-minimal set of skills to learn so every target career reaches a
+    # match of `threshold` (0-1, the scale of Match.match / 100, interests
+    # included). Targets default to the profile's recommendations. Skills
+    # come back ordered by how many targets they unlock, each with those
+    # targets' titles; "out_of_reach" lists targets that can't get there
+    # with skills alone (they are planned up to every skill).
+    idx = current_indexes()
+    have = set(idx.resolver.resolve_all(skills))
+    liked = set(idx.resolver.resolve_all(interests or []))
+    if targets is None:
+        if recommendations is None:
+            recommendations = recommend_careers("", skills, interests or [])
+        rows = [idx.catalog.row_of[m.career] for m in recommendations if m.career in idx.catalog.row_of]
+    else:
+        ids = (CAREER_IDS.ids.get(t) for t in targets)
+        rows = [idx.catalog.row_of[i] for i in ids if i in idx.catalog.row_of]
+    keys = SKILL_IDS.keys
+    required = [idx.catalog.skills_of(r) for r in rows]
+    owned = [[s for s in req if keys[s] in have] for req in required]
+    missing = [[s for s in req if keys[s] not in have] for req in required]
+    # match = SKILL_WEIGHT * skill fraction + interest term, so the skill
+    # fraction each target needs is what the interests don't already cover
+    # (the card shows the match rounded to 0.1%)
+    target = round(threshold * 100, 1) / 100 - 5e-4
+    fracs = [(target - INTEREST_WEIGHT * INTEREST_DAMPING * sum(keys[s] in liked for s in req) / len(req)) / SKILL_WEIGHT
+             if req else 0.0 for req in required]
+    result = plan(missing, needs(required, owned, fracs))
+    titles = [CAREER_IDS.name(int(idx.catalog.career_ids[r])) for r in rows]
+    return {
+        "targets": titles,
+        "threshold": threshold,
+        "out_of_reach": [t for t, f in zip(titles, fracs) if f > 1.0],
+        "exact": result.exact,
+        "skills": [
+            {"skill": SKILL_IDS.name(s),
+             "unlocks": [titles[t] for t in range(len(titles)) if result.unlocks[s] >> t & 1]}
+            for s in result.skills
+        ],
+    }
+
+@METRICS.timed("course_suggestions")
+def course_suggestions(recommendations: Sequence[Match]) -> Mapping[str, Tuple[str, ...]]:
+    # Aggregate missing skills → courses; cached like the recommendations
+    # (read-only, shared), keyed by the set of missing skill ids
+    needed = set()
+    for r in recommendations:
+        for s in r.missing:
+            needed.add(s)
+    key = ("courses", current_indexes().kb.version, frozenset(needed))
+    return RESULT_CACHE.get_or_compute(key, lambda: MappingProxyType(
+        {skill: tuple(links) for skill, links in courses_for(SKILL_IDS.name(s) for s in needed).items()}))
+
+def courses_for(skills) -> Dict[str, List[str]]:
+    needed = set(skills)
+    courses = {}
+    for s in needed:
+        courses[s] = SKILL_COURSES.get(s, ["Search Coursera/Udemy/YouTube for good intros"])
+    return courses
+
+# Build a simple semantic search over the career KB for Q&A
+def build_kb_texts(careers=None):
+    docs = []
+    labels = []
+    for title, info in (CAREERS if careers is None else careers).items():
+        blob = (
+            f"{title}. Description: {info['description']}. "
+            f"Skills: {', '.join(info['skills'])}. "
+            f"Roadmap: {' -> '.join(info['roadmap'])}. Salary: {info['salary']}."
+        )
+        docs.append(blob)
+        labels.append(title)
+    return docs, labels
+
+def _kb_docs(kb: Snapshot):
+    kb.details.prefetch(kb.careers)
+    return build_kb_texts(kb.careers)
+
+def career_answer(title: str, careers=None) -> str:
+    info = (CAREERS if careers is None else careers)[title]
+    return f"**{title}**\n\n{info['description']}\n\n**Top Skills:** {', '.join(info['skills'])}\n\n**Roadmap (high level):**\n" + \
+           "\n".join([f"- {step}" for step in info["roadmap"]]) + \
+           f"\n\n**Typical salary (entry to mid):** {info['salary']}"
+
+# Most Q&A traffic is a few hundred questions with cosmetic variations, so
+# answers are cached process-wide under the question's canonical token form.
+# Keys include the KB version and the cache is cleared whenever the index is
+# patched; QA_CACHE.stats() has hit/miss/eviction counts for sizing.
+QA_CACHE = LRUCache(maxsize=int(os.environ.get("ADVISOR_QA_CACHE_SIZE", 4096)),
+                    ttl=float(os.environ.get("ADVISOR_QA_CACHE_TTL", 3600)), sizeof=approx_size)
+
+def _search(qa: QAIndex, query: str, k: int, min_score: float) -> Tuple[Tuple[int, float], ...]:
+    key = (qa.kb_hash, qa.canonical(query), k, min_score)
+    return QA_CACHE.get_or_compute(key, lambda: tuple(qa.search(query, k, min_score)))
+
+def _search_many(qa: QAIndex, queries: List[str], k: int, min_score: float) -> List[Tuple[Tuple[int, float], ...]]:
+    # _search for many questions; the uncached ones are searched together
+    keys = [(qa.kb_hash, qa.canonical(q), k, min_score) for q in queries]
+    return QA_CACHE.get_or_compute_many(keys, lambda todo: [tuple(hits) for hits in
+                                                              qa.search_many([queries[n] for n in todo], k, min_score)])
+
+@METRICS.timed("qa_search")
+def qa_search(query: str, k: int = 3, min_score: float = 0.0) -> List[Tuple[str, float]]:
+    # Top-k careers for a question as (title, cosine score), best first
+    qa = qa_indexes().qa
+    return [(qa.labels[i], score) for i, score in _search(qa, query, k, min_score)]
+
+@METRICS.timed("qa_search_batch")
+def qa_search_batch(queries: List[str], k: int = 3, min_score: float = 0.0) -> List[List[Tuple[str, float]]]:
+    qa = qa_indexes().qa
+    return [[(qa.labels[i], score) for i, score in hits] for hits in _search_many(qa, queries, k, min_score)]
+
+@METRICS.timed("qa_answer")
+def qa_answer(query: str):
+    idx = qa_indexes()
+    hits = _search(idx.qa, query, 1, 0.0)
+    # No shared term at all: fall back to the first career with zero confidence
+    i, conf = hits[0] if hits else (0, 0.0)
+    title = idx.qa.labels[i]
+    return career_answer(title, idx.kb.careers), title, conf
+
+@METRICS.timed("qa_answer_batch")
+def qa_answer_batch(queries: List[str]) -> List[Tuple[str, str, float]]:
+    # qa_answer for many questions; the uncached ones are searched in one sparse product
+    idx = qa_indexes()
+    out = []
+    for hits in _search_many(idx.qa, queries, 1, 0.0):
+        i, conf = hits[0] if hits else (0, 0.0)
+        title = idx.qa.labels[i]
+        out.append((career_answer(title, idx.kb.careers), title, conf))
+    return out
+
+# Passage hits fused with the career score are re-ranked from this many
+# BM25 candidates (at least), since fusion can reorder them
+PASSAGE_RERANK_DEPTH = 50
+
+@METRICS.timed("passage_search")
+def passage_search(query: str, k: int = 5, career_weight: float = 0.0, min_score: float = 0.0) -> List[Dict]:
+    # The roadmap steps, descriptions, skills and course hints that best
+    # answer a question, by BM25 (see passages.py). With career_weight > 0,
+    # each hit's score becomes (1 - w) * BM25 / best BM25 + w * the TF-IDF
+    # cosine of its best-matching parent career, so steps of the career the
+    # question is about rise. Identical texts are one hit listing every
+    # (kind, parent) that uses them.
+    idx = passage_indexes()
+    pi = idx.passages
+    depth = max(PASSAGE_RERANK_DEPTH, 10 * k) if career_weight else k
+    key = ("passages", pi.kb_hash, pi.canonical(query), depth, min_score)
+    hits = QA_CACHE.get_or_compute(key, lambda: tuple(pi.search(query, depth, min_score)))
+    if not hits:
+        return []
+    ids = np.array([t for t, _ in hits], dtype=np.int64)
+    scores = np.array([s for _, s in hits])
+    if career_weight and idx.qa.kb_hash == pi.kb_hash:
+        rows = [pi.careers_of(t) for t in ids.tolist()]
+        flat = np.concatenate(rows)
+        career = np.zeros(len(ids))
+        if len(flat):
+            cos = np.asarray(idx.qa.doc_vec[flat] @ idx.qa.transform([query]).T.toarray()).ravel()
+            ends = np.cumsum([len(r) for r in rows])
+            for i, (lo, hi) in enumerate(zip(np.r_[0, ends[:-1]], ends)):
+                if hi > lo:
+                    career[i] = cos[lo:hi].max()
+        scores = (1 - career_weight) * scores / scores[0] + career_weight * career
+        order = np.lexsort((np.arange(len(ids)), -scores))
+        ids, scores = ids[order], scores[order]
+    # Without fusion (Q&A index from another KB version) the deeper BM25
+    # candidate list is cut here too
+    ids, scores = ids[:k], scores[:k]
+    return [{"text": pi.texts[t], "score": float(s), "sources": pi.owners(t)} for t, s in zip(ids.tolist(), scores.tolist())]
+
+# Cache effectiveness for the metrics export (see metrics.py)
+def _cache_stats(key: str) -> Dict[str, float]:
+    resolver = _INDEXES.resolver._resolve.cache_info()
+    return {"qa": QA_CACHE.stats()[key], "results": RESULT_CACHE.stats()[key], "skill_resolver": getattr(resolver, key)}
+
+def _lru_stats(key: str) -> Dict[str, float]:
+    return {"qa": QA_CACHE.stats()[key], "results": RESULT_CACHE.stats()[key]}
+
+METRICS.collector("cache_hits_total", "Cache hits", "counter", "cache", lambda: _cache_stats("hits"))
+METRICS.collector("cache_misses_total", "Cache misses", "counter", "cache", lambda: _cache_stats("misses"))
+METRICS.collector("cache_coalesced_total", "Cache misses that waited for an identical in-flight computation",
+                  "counter", "cache", lambda: _lru_stats("coalesced"))
+METRICS.collector("cache_entries", "Cached entries", "gauge", "cache", lambda: _lru_stats("size"))
+METRICS.collector("cache_bytes", "Approximate memory held by cached keys and values", "gauge", "cache",
+                  lambda: _lru_stats("bytes"))
+METRICS.collector("index_builds_total", "Index builds and patches", "counter", "index", index_builds)
+
+if QA_STARTUP == "eager":
+    qa_indexes()
@@ -1,376 +1,34 @@
+import os
 import streamlit as st
-from typing import List, Dict
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from facets import SALARY_BANDS
+from metrics import METRICS, start_exporters
+from skills import DOMAINS
+from advisor import (CAREERS, parse_list, recommend_careers, course_suggestions, qa_search, career_answer, warm_qa_index,
+                     explain_skills, QA_CACHE, RESULT_CACHE, describe, career_title, recommend_careers_live,
+                     next_skills, courses_for, plan_skills, passage_search, skill_choices)
 
 st.set_page_config(page_title="AI Career Advisor (India)", page_icon="🎓", layout="wide")
 
-# -----------------------------
-# Knowledge Base (Careers)
-# -----------------------------
-CAREERS: Dict[str, Dict] = {
-    "Data Scientist": {
-        "skills": ["Python", "Machine Learning", "Statistics", "SQL"],
-        "description": "Data Scientists analyze data to extract insights and build predictive models.",
-        "roadmap": [
-            "Learn Python, SQL, and Statistics",
-            "Master data visualization (Matplotlib, Power BI, Tableau)",
-            "Study Machine Learning (Scikit-learn, TensorFlow, PyTorch)",
-            "Work on real-world datasets & Kaggle competitions",
-            "Intern as Data Analyst → Move to Data Scientist role"
-        ],
-        "salary": "₹6–20 LPA in India"
-    },
-    "Software Engineer": {
-        "skills": ["Java", "C++", "Python", "System Design"],
-        "description": "Software Engineers design, develop, and maintain applications and systems.",
-        "roadmap": [
-            "Master programming languages (C++, Java, Python)",
-            "Learn DSA & problem-solving (LeetCode, Codeforces)",
-            "Understand DBMS, OS, Computer Networks",
-            "Practice system design for scalability",
-            "Apply for SDE internships and jobs"
-        ],
-        "salary": "₹4–18 LPA in India"
-    },
-    "Cloud Engineer": {
-        "skills": ["Linux", "Networking", "GCP", "AWS", "Azure", "Docker", "Kubernetes"],
-        "description": "Cloud Engineers manage and deploy applications on cloud platforms.",
-        "roadmap": [
-            "Learn basics of Linux & Networking",
-            "Get certified in AWS/Azure/GCP",
-            "Master containers (Docker, Kubernetes)",
-            "Learn Infrastructure as Code (Terraform)",
-            "Work on deploying scalable apps"
-        ],
-        "salary": "₹5–16 LPA in India"
-    },
-    "UI/UX Designer": {
-        "skills": ["Figma", "Adobe XD", "Creativity", "User Research"],
-        "description": "UI/UX Designers create intuitive and visually appealing user interfaces.",
-        "roadmap": [
-            "Learn Figma/Adobe XD for design",
-            "Study design principles & color theory",
-            "Understand UX research & user psychology",
-            "Build a design portfolio",
-            "Apply for UI/UX internships"
-        ],
-        "salary": "₹3–12 LPA in India"
-    },
-    "Business Analyst": {
-        "skills": ["Excel", "SQL", "Data Visualization", "Problem Solving"],
-        "description": "Business Analysts analyze processes and suggest improvements using data insights.",
-        "roadmap": [
-            "Master Excel & SQL",
-            "Learn data visualization (Power BI, Tableau)",
-            "Understand business processes",
-            "Work on case studies & projects",
-            "Apply for BA internships"
-        ],
-        "salary": "₹4–14 LPA in India"
-    },
-    "AI Engineer": {
-        "skills": ["Python", "Deep Learning", "NLP", "TensorFlow", "PyTorch"],
-        "description": "AI Engineers build, train, and deploy intelligent systems and AI models.",
-        "roadmap": [
-            "Learn Python, Linear Algebra & Probability",
-            "Master Deep Learning frameworks (PyTorch/TensorFlow)",
-            "Work on NLP & Computer Vision projects",
-            "Understand MLOps for deploying AI models",
-            "Contribute to open-source AI projects"
-        ],
-        "salary": "₹6–25 LPA in India"
-    },
-    "DevOps Engineer": {
-        "skills": ["Linux", "AWS", "CI/CD", "Docker", "Kubernetes"],
-        "description": "DevOps Engineers automate deployment, integration, and system monitoring.",
-        "roadmap": [
-            "Learn Linux, Git, and Shell scripting",
-            "Understand CI/CD pipelines (Jenkins, GitHub Actions)",
-            "Master containers & orchestration (Docker, Kubernetes)",
-            "Learn cloud platforms (AWS/Azure/GCP)",
-            "Work on real-world DevOps projects"
-        ],
-        "salary": "₹5–18 LPA in India"
-    },
-    "Cybersecurity Analyst": {
-        "skills": ["Networking", "Ethical Hacking", "Security Tools", "Risk Management"],
-        "description": "Cybersecurity Analysts protect systems from cyber threats and vulnerabilities.",
-        "roadmap": [
-            "Learn Networking & Security fundamentals",
-            "Study firewalls, IDS/IPS, and encryption",
-            "Get certified (CEH, CompTIA Security+, CISSP)",
-            "Practice penetration testing & incident response",
-            "Work in SOC (Security Operations Center)"
-        ],
-        "salary": "₹4–15 LPA in India"
-    },
-    "Data Engineer": {
-        "skills": ["SQL", "Python", "ETL", "Big Data", "Spark"],
-        "description": "Data Engineers design and maintain systems that collect and process large datasets.",
-        "roadmap": [
-            "Learn SQL and Python for data processing",
-            "Understand ETL pipelines",
-            "Work with Hadoop, Spark, Kafka",
-            "Learn data warehousing (Snowflake, Redshift)",
-            "Work on real-world data engineering projects"
-        ],
-        "salary": "₹6–18 LPA in India"
-    },
-    "Full Stack Developer": {
-        "skills": ["JavaScript", "React", "Node.js", "Databases", "APIs"],
-        "description": "Full Stack Developers work on both frontend and backend of web applications.",
-        "roadmap": [
-            "Learn HTML, CSS, JavaScript",
-            "Master frontend frameworks (React, Angular, Vue)",
-            "Learn backend with Node.js/Django/Flask",
-            "Understand REST APIs & Databases",
-            "Build and deploy full-stack projects"
-        ],
-        "salary": "₹4–16 LPA in India"
-    },
-    "Mobile App Developer": {
-        "skills": ["Flutter", "React Native", "Java", "Kotlin", "Swift"],
-        "description": "Mobile Developers build apps for Android and iOS platforms.",
-        "roadmap": [
-            "Learn Java/Kotlin for Android, Swift for iOS",
-            "Explore cross-platform frameworks (Flutter, React Native)",
-            "Understand UI/UX for mobile apps",
-            "Practice app deployment on Play Store/App Store",
-            "Work on real-world mobile projects"
-        ],
-        "salary": "₹3–14 LPA in India"
-    },
-    "Product Manager": {
-        "skills": ["Communication", "Business Strategy", "Agile", "Market Research"],
-        "description": "Product Managers lead product development and align business strategy with tech solutions.",
-        "roadmap": [
-            "Learn basics of business & product development",
-            "Understand Agile & Scrum methodologies",
-            "Work on product case studies",
-            "Develop communication & leadership skills",
-            "Apply for Associate PM roles"
-        ],
-        "salary": "₹8–30 LPA in India"
-    },
-    "QA Engineer": {
-        "skills": ["Manual Testing", "Automation Testing", "Selenium", "JMeter"],
-        "description": "QA Engineers ensure the quality of software by testing and reporting bugs.",
-        "roadmap": [
-            "Learn manual testing & test case writing",
-            "Understand SDLC & STLC",
-            "Master automation tools (Selenium, Cypress)",
-            "Learn performance testing (JMeter, LoadRunner)",
-            "Apply for QA roles"
-        ],
-        "salary": "₹3–12 LPA in India"
-    },
-    "Game Developer": {
-        "skills": ["Unity", "C#", "C++", "Game Design", "3D Modeling"],
-        "description": "Game Developers design and develop interactive video games for various platforms.",
-        "roadmap": [
-            "Learn game engines (Unity, Unreal)",
-            "Practice programming with C#/C++",
-            "Understand graphics, physics & AI in games",
-            "Build indie game projects",
-            "Apply to gaming studios"
-        ],
-        "salary": "₹4–15 LPA in India"
-    },
-    "Blockchain Developer": {
-        "skills": ["Solidity", "Ethereum", "Smart Contracts", "Cryptography"],
-        "description": "Blockchain Developers create decentralized applications and smart contracts.",
-        "roadmap": [
-            "Learn blockchain basics & cryptography",
-            "Master Solidity & Ethereum",
-            "Understand smart contracts & DApps",
-            "Work on blockchain projects",
-            "Contribute to Web3 open-source"
-        ],
-        "salary": "₹6–20 LPA in India"
-    },
-    "AR/VR Developer": {
-        "skills": ["Unity", "C#", "3D Modeling", "ARKit", "ARCore"],
-        "description": "AR/VR Developers build immersive augmented and virtual reality applications.",
-        "roadmap": [
-            "Learn Unity/Unreal for AR/VR",
-            "Understand 3D modeling (Blender, Maya)",
-            "Practice ARKit (iOS) & ARCore (Android)",
-            "Build AR/VR projects",
-            "Apply for AR/VR developer jobs"
-        ],
-        "salary": "₹5–18 LPA in India"
-    },
-    "IT Support Specialist": {
-        "skills": ["Troubleshooting", "Networking", "Windows/Linux", "Customer Support"],
-        "description": "IT Support Specialists provide technical assistance and solve hardware/software issues.",
-        "roadmap": [
-            "Learn computer hardware & OS basics",
-            "Understand networking & troubleshooting",
-            "Get certified (CompTIA A+, CCNA)",
-            "Work in helpdesk or IT support roles",
-            "Grow into system admin/network engineer"
-        ],
-        "salary": "₹2–8 LPA in India"
-    },
-    "Digital Marketer": {
-        "skills": ["SEO", "Google Ads", "Content Marketing", "Analytics"],
-        "description": "Digital Marketers promote businesses online using SEO, paid ads, and social media.",
-        "roadmap": [
-            "Learn SEO & SEM fundamentals",
-            "Master social media marketing",
-            "Understand Google Analytics & Ads",
-            "Work on campaigns & content marketing",
-            "Apply for digital marketing jobs"
-        ],
-        "salary": "₹3–10 LPA in India"
-    },
-    # From your earlier FastAPI roles:
-    "Data Analyst": {
-        "skills": ["SQL", "Excel", "Python", "Data Visualization", "Statistics"],
-        "description": "Analyze data using SQL, Excel, Python; build dashboards and insights.",
-        "roadmap": [
-            "Master SQL (joins, window functions)",
-            "Learn Excel advanced (pivots, charts, formulas)",
-            "Use Python for data wrangling (pandas, numpy)",
-            "Learn BI tools (Power BI/Tableau)",
-            "Build dashboards and publish portfolio"
-        ],
-        "salary": "₹3.5–7 LPA in India"
-    },
-    "Product Analyst": {
-        "skills": ["SQL", "A/B Testing", "Product Metrics", "Data Visualization"],
-        "description": "Use product metrics and experimentation to inform roadmap decisions.",
-        "roadmap": [
-            "Learn core product metrics (retention, WAU/MAU, funnels)",
-            "Study A/B testing design & analysis",
-            "Query data with SQL",
-            "Build dashboards and run experiments",
-            "Partner with PMs to drive insights"
-        ],
-        "salary": "₹5–9 LPA in India"
-    },
-    "Cloud Support Associate": {
-        "skills": ["Linux", "Networking", "GCP Core", "Scripting", "Customer Support"],
-        "description": "Provide technical support for cloud services; troubleshoot infra issues.",
-        "roadmap": [
-            "Learn Linux & basic networking",
-            "Study GCP/AWS fundamentals (cloud concepts)",
-            "Practice scripting (Bash/Python)",
-            "Understand ticketing & troubleshooting playbooks",
-            "Prepare for Cloud Digital Leader/Cloud Practitioner"
-        ],
-        "salary": "₹3–6 LPA in India"
-    },
-    "Junior ML Engineer": {
-        "skills": ["Python", "ML Basics", "Data Pipelines", "GCP Vertex AI", "Docker"],
-        "description": "Build and deploy ML models; data pipelines; evaluate metrics.",
-        "roadmap": [
-            "Master Python & ML (scikit-learn, model eval)",
-            "Build ETL/data pipelines",
-            "Containerize with Docker",
-            "Deploy simple models (FastAPI/Vertex AI endpoints)",
-            "Track experiments & metrics"
-        ],
-        "salary": "₹6–12 LPA in India"
-    },
-}
-
-# Simple skill → free course hints
-SKILL_COURSES = {
-    "Python": ["Kaggle: Python", "freeCodeCamp: Python for Data"],
-    "SQL": ["Mode SQL Tutorial", "Khan Academy: SQL"],
-    "Statistics": ["Khan Academy: Statistics", "StatQuest on YouTube"],
-    "Machine Learning": ["Google ML Crash Course", "fast.ai Practical Deep Learning"],
-    "Data Visualization": ["Power BI Microsoft Learn", "Tableau Free Training"],
-    "Excel": ["ExcelJet", "Microsoft Learn: Excel"],
-    "Linux": ["Linux Journey", "Ubuntu Tutorials"],
-    "Networking": ["Cisco NetAcad Intro", "Professor Messer: Network+"],
-    "Docker": ["Docker Getting Started", "Kubernetes Basics"],
-    "Kubernetes": ["Kubernetes Docs Basics", "KodeKloud Free K8s Course"],
-    "React": ["react.dev Learn", "Scrimba React Free"],
-    "Node.js": ["nodejs.dev Learn", "The Odin Project: Node"],
-    "Flutter": ["Flutter.dev Docs", "AppBrewery Free Intro"],
-    "Java": ["JetBrains Academy Java Basics", "Oracle Java Tutorials"],
-    "C++": ["cppreference (Learn)", "freeCodeCamp: C++"],
-    "System Design": ["System Design Primer", "Grokking summaries"],
-    "NLP": ["Hugging Face Course", "fast.ai NLP"],
-    "Deep Learning": ["DeepLearning.AI Short Courses", "fast.ai"],
-    "Cybersecurity": ["TryHackMe Free Rooms", "OverTheWire Wargames"],
-}
+# Q&A: how many careers to retrieve, and the score below which we call it no match
+QA_TOP_K = 4
+QA_MIN_SCORE = 0.05
 
-# -----------------------------
-# Helpers
-# -----------------------------
-def normalize(items: List[str]) -> List[str]:
-    return [i.strip().lower() for i in items if isinstance(i, str)]
-
-def score_match(user_skills: List[str], career_skills: List[str]) -> float:
-    u = set(normalize(user_skills))
-    r = set(normalize(career_skills))
-    if not r:
-        return 0.0
-    return len(u.intersection(r)) / len(r)
-
-def recommend_careers(name: str, skills: List[str], interests: List[str]):
-    out = []
-    for title, info in CAREERS.items():
-        skill_score = score_match(skills, info["skills"])
-        interest_score = 0.0
-        if interests:
-            interest_score = score_match(interests, info["skills"]) * 0.5
-        final = 0.8 * skill_score + 0.2 * interest_score
-        if final > 0:
-            out.append({
-                "career": title,
-                "match": round(final * 100, 1),
-                "description": info["description"],
-                "roadmap": info["roadmap"],
-                "salary": info["salary"],
-                "skills_missed": [s for s in info["skills"] if s.lower() not in normalize(skills)]
-            })
-    out.sort(key=lambda x: x["match"], reverse=True)
-    return out[:10]
-
-def course_suggestions(recommendations):
-    # Aggregate missing skills → courses
-    needed = set()
-    for r in recommendations:
-        for s in r["skills_missed"]:
-            needed.add(s)
-    courses = {}
-    for s in needed:
-        courses[s] = SKILL_COURSES.get(s, ["Search Coursera/Udemy/YouTube for good intros"])
-    return courses
-
-# Build a simple semantic search over the career KB for Q&A
-def build_kb_texts():
-    docs = []
-    labels = []
-    for title, info in CAREERS.items():
-        blob = (
-            f"{title}. Description: {info['description']}. "
-            f"Skills: {', '.join(info['skills'])}. "
-            f"Roadmap: {' -> '.join(info['roadmap'])}. Salary: {info['salary']}."
-        )
-        docs.append(blob)
-        labels.append(title)
-    return docs, labels
-
-DOCS, LABELS = build_kb_texts()
-VEC = TfidfVectorizer(stop_words="english").fit(DOCS)
-DOC_VEC = VEC.transform(DOCS)
-
-def qa_answer(query: str):
-    qv = VEC.transform([query])
-    sims = cosine_similarity(qv, DOC_VEC)[0]
-    idx = sims.argmax()
-    title = LABELS[idx]
-    info = CAREERS[title]
-    answer = f"**{title}**\n\n{info['description']}\n\n**Top Skills:** {', '.join(info['skills'])}\n\n**Roadmap (high level):**\n" + \
-             "\n".join([f"- {step}" for step in info["roadmap"]]) + \
-             f"\n\n**Typical salary (entry to mid):** {info['salary']}"
-    return answer, title, sims[idx]
+# Q&A also lists the best-matching roadmap steps, descriptions, skills and
+# course hints; their BM25 score is blended with the parent career's score
+PASSAGE_TOP_K = 5
+PASSAGE_CAREER_WEIGHT = 0.3
+PASSAGE_KINDS = {"description": "About", "roadmap": "Roadmap step", "skill": "Skill", "course": "Course"}
+
+TABS = ["🏠 Home", "🎯 Career Matches", "🛣 Roadmaps", "📚 Courses", "💬 Q&A"]
+
+# Career Matches shows this many cards per page; only the visible page is rendered
+MATCHES_PAGE_SIZE = 5
+
+# How many "learn X next" suggestions the Courses tab shows
+NEXT_SKILLS = 5
+
+# Per-stage timings panel in the sidebar: ADVISOR_DEBUG=1 or ?debug=1 in the URL
+DEBUG_PANEL = os.environ.get("ADVISOR_DEBUG", "0") != "0"
 
 # -----------------------------
 # UI
@@ -424,35 +82,119 @@ def sidebar():
         st.session_state.setdefault("user", "")
         st.session_state["user"] = st.text_input("Your name", value=st.session_state["user"])
         st.markdown("---")
+        career_filters()
+        st.markdown("---")
         st.caption("Made for hackathons • Streamlit Cloud deploy")
+        if DEBUG_PANEL or st.query_params.get("debug") == "1":
+            # Filled in at the end of main(), once every stage has run
+            return st.empty()
+
+def career_filters():
+    st.markdown("**🔎 Filter careers**")
+    st.select_slider("Minimum salary", options=[0.0, *SALARY_BANDS], key="f_salary", on_change=apply_filters,
+                     format_func=lambda v: f"₹{v:g}+ LPA" if v else "Any")
+    st.multiselect("Domains", list(DOMAINS), key="f_domains", on_change=apply_filters)
+    st.multiselect("Must require", skill_choices(), key="f_skills", on_change=apply_filters)
+
+def active_filters() -> dict:
+    return {"min_salary": st.session_state.get("f_salary") or None,
+            "domains": st.session_state.get("f_domains") or None,
+            "required_skills": st.session_state.get("f_skills") or None}
+
+def apply_filters():
+    # Filter callback: rescore the current profile so every tab sees the new list
+    profile = st.session_state.get("profile")
+    if profile:
+        st.session_state["recommendations"] = recommend_careers(profile["name"], profile["skills"], profile["interests"],
+                                                                **active_filters())
+        st.session_state["matches_page"] = 0
+
+def debug_panel(slot):
+    stages = METRICS.rerun_breakdown()
+    counters = METRICS.counters
+    with slot.container():
+        st.markdown("---")
+        st.markdown("**⏱ This rerun**")
+        st.markdown("\n".join(f"- `{name}` {seconds * 1e3:.2f} ms" for name, seconds in stages))
+        st.caption(f"Reruns {counters.get('reruns', 0):g} • sessions {counters.get('sessions', 0):g} • "
+                   f"Q&A cache hit rate {QA_CACHE.stats()['hit_rate']:.0%} • "
+                   f"results cache hit rate {RESULT_CACHE.stats()['hit_rate']:.0%}")
+
+def profile_inputs(live: bool):
+    # Keyed and persisted so the profile survives switching tabs
+    name = st.text_input("Name", key="in_name", persist_state="page")
+    skills = st.text_input("Your skills (comma-separated)", placeholder="Python, SQL, Machine Learning",
+                           key="in_skills", persist_state="page", live=live)
+    interests = st.text_input("Your interests (optional, comma-separated)", placeholder="data, product, cloud",
+                              key="in_interests", persist_state="page", live=live)
+    return name, skills, interests
 
+@st.fragment
 def home_form():
     st.subheader("Tell us about you")
-    with st.form("profile_form"):
-        name = st.text_input("Name")
-        skills = st.text_input("Your skills (comma-separated)", placeholder="Python, SQL, Machine Learning")
-        interests = st.text_input("Your interests (optional, comma-separated)", placeholder="data, product, cloud")
-        submitted = st.form_submit_button("🔍 Get Career Matches")
+    live = st.toggle("Update matches as I type", value=True, key="live_matches", persist_state="page")
+    if live:
+        # Inputs commit shortly after typing stops; each commit rescores
+        # only the skills that changed since the last one
+        name, skills, interests = profile_inputs(live=True)
+        submitted = bool(skills.strip() or interests.strip())
+        if not submitted:
+            # Cleared profile: drop its matches rather than keep showing them
+            for key in ("recommendations", "profile", "live_scorer"):
+                st.session_state.pop(key, None)
+    else:
+        with st.form("profile_form"):
+            name, skills, interests = profile_inputs(live=False)
+            submitted = st.form_submit_button("🔍 Get Career Matches")
     if submitted:
-        u_skills = [s.strip() for s in skills.split(",") if s.strip()]
-        u_interests = [s.strip() for s in interests.split(",") if s.strip()]
-        recs = recommend_careers(name, u_skills, u_interests)
+        u_skills = parse_list(skills)
+        u_interests = parse_list(interests)
+        filters = active_filters()
+        if any(filters.values()):
+            # Filtered recommendations score only the careers that pass
+            recs = recommend_careers(name, u_skills, u_interests, **filters)
+        elif live:
+            scorer, recs = recommend_careers_live(st.session_state.get("live_scorer"), u_skills, u_interests)
+            st.session_state["live_scorer"] = scorer
+        else:
+            recs = recommend_careers(name, u_skills, u_interests)
         st.session_state["profile"] = {"name": name, "skills": u_skills, "interests": u_interests}
         st.session_state["recommendations"] = recs
+        st.session_state["matches_page"] = 0
+        understood = explain_skills(u_skills + u_interests)
+        if understood:
+            st.caption("Understood " + ", ".join(f"“{typed}” as {skill}" for typed, skill in understood))
+        if recs and live:
+            st.caption("Top matches: " + " • ".join(f"{career_title(r)} ({r.match}%)" for r in recs[:3]))
         if recs:
             st.success(f"Found {len(recs)} matches. Jump to the **Career Matches** tab!")
         else:
             st.warning("No matches yet. Try adding a few more skills.")
 
+def open_tab(label: str, career: str):
+    # Button callback: runs before the rerun, so it may still set the tabs' state
+    st.session_state["selected_career"] = career
+    st.session_state["tab"] = label
+
+def set_matches_page(page: int):
+    st.session_state["matches_page"] = page
+
+@st.fragment
 def matches_view():
     st.subheader("Career Matches")
     recs = st.session_state.get("recommendations", [])
     if not recs:
-        st.info("No recommendations yet—fill the form in **Home**.")
+        if st.session_state.get("profile") and any(active_filters().values()):
+            st.info("No careers match these filters. Loosen them in the sidebar.")
+        else:
+            st.info("No recommendations yet—fill the form in **Home**.")
         return
 
-    for r in recs:
-        with st.container():
+    pages = (len(recs) + MATCHES_PAGE_SIZE - 1) // MATCHES_PAGE_SIZE
+    page = min(st.session_state.get("matches_page", 0), pages - 1)
+    start = page * MATCHES_PAGE_SIZE
+    for r in describe(recs[start:start + MATCHES_PAGE_SIZE]):
+        with METRICS.stage("matches_card"), st.container():
             st.markdown('<div class="card">', unsafe_allow_html=True)
             cols = st.columns([4, 1])
             with cols[0]:
@@ -462,15 +204,20 @@ def matches_view():
                 if r["skills_missed"]:
                     st.caption("Missing skills: " + ", ".join(r["skills_missed"]))
             with cols[1]:
-                if st.button("📍 See Roadmap", key=f"rm_{r['career']}"):
-                    st.session_state["selected_career"] = r["career"]
-                    st.switch_page = "Roadmaps"
-                if st.button("📚 Courses", key=f"cs_{r['career']}"):
-                    st.session_state["selected_career"] = r["career"]
-                    st.switch_page = "Courses"
+                # Another tab has to render, so these rerun the app, not just this fragment
+                if st.button("📍 See Roadmap", key=f"rm_{r['career']}", on_click=open_tab, args=(TABS[2], r["career"])):
+                    st.rerun()
+                if st.button("📚 Courses", key=f"cs_{r['career']}", on_click=open_tab, args=(TABS[3], r["career"])):
+                    st.rerun()
             st.markdown('</div>', unsafe_allow_html=True)
             st.markdown("")
 
+    if pages > 1:
+        prev, info, nxt = st.columns([1, 2, 1])
+        prev.button("← Previous", disabled=page == 0, on_click=set_matches_page, args=(page - 1,))
+        info.caption(f"Page {page + 1} of {pages} • {len(recs)} matches")
+        nxt.button("Next →", disabled=page == pages - 1, on_click=set_matches_page, args=(page + 1,))
+
 def roadmap_view():
     st.subheader("Roadmap")
     career = st.session_state.get("selected_career")
@@ -479,7 +226,7 @@ def roadmap_view():
         st.info("No recommendations yet—use **Home** first.")
         return
     if not career:
-        career = recs[0]["career"]
+        career = career_title(recs[0])
 
     info = CAREERS.get(career)
     if not info:
@@ -493,12 +240,56 @@ def roadmap_view():
     for i, step in enumerate(info["roadmap"], start=1):
         st.markdown(f'<div class="roadstep"><b>Step {i}.</b> {step}</div>', unsafe_allow_html=True)
 
+    skill_plan(career, recs)
+
+@st.fragment
+def skill_plan(career: str, recs):
+    # Fewest skills to learn for a chosen group of roles, in learning order
+    st.markdown("#### 🎯 Skill plan")
+    profile = st.session_state.get("profile") or {"skills": [], "interests": []}
+    options = list(dict.fromkeys([career] + [career_title(r) for r in recs]))
+    targets = st.multiselect("Target careers", options, default=options[:3], key="plan_targets")
+    # Same scale as the match % on the career cards
+    threshold = st.slider("Qualify at match of", 50, 100, 70, step=5, format="%d%%", key="plan_threshold")
+    if not targets:
+        st.caption("Pick at least one target career.")
+        return
+    result = plan_skills(profile["skills"], targets=targets, threshold=threshold / 100,
+                         interests=profile.get("interests"))
+    if result["out_of_reach"]:
+        st.caption(f"Skills alone can't take {', '.join(result['out_of_reach'])} to {threshold}%; "
+                   "the plan covers all of their skills.")
+    if not result["skills"]:
+        st.success("You already qualify for every target at this level.")
+        return
+    reached = len(targets) - len(result["out_of_reach"])
+    st.caption(f"{len(result['skills'])} skills get you to {threshold}% on {reached} of {len(targets)} targets"
+               + ("" if result["exact"] else " (near-minimal)"))
+    for i, step in enumerate(result["skills"], start=1):
+        st.markdown(f'<div class="roadstep"><b>Step {i}. Learn {step["skill"]}</b> — unlocks '
+                    f'{", ".join(step["unlocks"])}</div>', unsafe_allow_html=True)
+
 def courses_view():
     st.subheader("Courses")
     recs = st.session_state.get("recommendations", [])
     if not recs:
         st.info("No recommendations yet—use **Home** first.")
         return
+    profile = st.session_state.get("profile")
+    if profile:
+        picks = next_skills(profile["skills"], profile["interests"], n=NEXT_SKILLS, recommendations=recs)
+        if picks:
+            st.markdown("#### 🚀 Best next skills")
+            st.caption("What learning one more skill would do to your current matches")
+            for pick in picks:
+                lifts = ", ".join(f"{t} {old:g}% → {new:g}%" for t, old, new in pick["careers"][:3])
+                more = len(pick["careers"]) - 3
+                st.markdown(f"**Learn {pick['skill']} next** → +{pick['gain']:g} match points across your top careers: "
+                            f"{lifts}" + (f" and {more} more" if more > 0 else ""))
+                links = courses_for([pick["skill"]])[pick["skill"]]
+                st.caption(" • ".join(links))
+            st.markdown("#### All missing skills")
+
     # aggregate missing skills → show courses
     suggestions = course_suggestions(recs)
     if not suggestions:
@@ -510,6 +301,7 @@ def courses_view():
             for link in links:
                 st.write(f"- {link}")
 
+@st.fragment
 def qa_view():
     st.subheader("Ask anything about careers (semantic search)")
     q = st.text_input("Your question", placeholder="e.g., What skills do I need for Data Engineer?")
@@ -517,29 +309,58 @@ def qa_view():
         if not q.strip():
             st.warning("Type a question first.")
         else:
-            answer, title, conf = qa_answer(q.strip())
-            st.markdown(answer)
-            st.caption(f"Match confidence: {conf:.2f}")
+            with METRICS.stage("qa_answer"):
+                hits = qa_search(q.strip(), k=QA_TOP_K, min_score=QA_MIN_SCORE)
+                passages = passage_search(q.strip(), k=PASSAGE_TOP_K, career_weight=PASSAGE_CAREER_WEIGHT)
+                if not hits and not passages:
+                    st.info("No confident match. Try naming a role, skill or tool.")
+                    return
+                if hits:
+                    title, conf = hits[0]
+                    st.markdown(career_answer(title))
+                    st.caption(f"Match confidence: {conf:.2f}")
+                    if len(hits) > 1:
+                        st.markdown("**Also relevant:** " + " • ".join(f"{t} ({s:.2f})" for t, s in hits[1:]))
+                if passages:
+                    st.markdown("**Most relevant passages**")
+                    for p in passages:
+                        kind = PASSAGE_KINDS[p["sources"][0][0]]
+                        parents = list(dict.fromkeys(parent for _, parent in p["sources"]))
+                        more = f" and {len(parents) - 3} more" if len(parents) > 3 else ""
+                        st.markdown(f"- {p['text']}")
+                        st.caption(f"{kind} · {', '.join(parents[:3])}{more}")
 
 # -----------------------------
 # Main
 # -----------------------------
+VIEWS = [home_form, matches_view, roadmap_view, courses_view, qa_view]
+
 def main():
-    header()
-    sidebar()
-
-    tabs = st.tabs(["🏠 Home", "🎯 Career Matches", "🛣 Roadmaps", "📚 Courses", "💬 Q&A"])
-
-    with tabs[0]:
-        home_form()
-    with tabs[1]:
-        matches_view()
-    with tabs[2]:
-        roadmap_view()
-    with tabs[3]:
-        courses_view()
-    with tabs[4]:
-        qa_view()
+    # Once per process (Streamlit reruns this script for every interaction)
+    start_exporters()
+    METRICS.begin_rerun()
+    METRICS.inc("reruns")
+    if "session_started" not in st.session_state:
+        st.session_state["session_started"] = True
+        METRICS.inc("sessions")
+
+    with METRICS.stage("rerun"):
+        with METRICS.stage("header"):
+            header()
+        debug = sidebar()
+
+        # Only the open tab runs; switching tabs reruns the app to render the new one
+        tabs = st.tabs(TABS, key="tab", on_change="rerun")
+        for tab, view in zip(tabs, VIEWS):
+            if tab.open:
+                with tab:
+                    view()
+
+    if debug is not None:
+        debug_panel(debug)
+
+    # Page is rendered; load the Q&A stack off the critical path
+    warm_qa_index()
 
 if __name__ == "__main__":
     main()
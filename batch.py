@@ -0,0 +1,176 @@
+"""Score a whole cohort of student profiles without the Streamlit UI.
+
+    python batch.py cohort.csv results.jsonl --workers 4
+
+Input is CSV or Parquet with `name`, `skills` and `interests` columns
+(skills/interests comma-separated, like the Home form). Output format
+follows the extension: .jsonl, .csv or .parquet. Both sides are streamed
+chunk by chunk, so memory stays flat regardless of cohort size.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple
+
+from advisor import parse_list, recommend_careers_batch, course_suggestions, career_title, missed_skills
+
+Row = Tuple[str, str, str]
+
+# -----------------------------
+# Input
+# -----------------------------
+def read_chunks(path: str, chunk_size: int, cols: List[str]) -> Iterator[List[Row]]:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        pq = _pyarrow_parquet()
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=cols):
+            data = batch.to_pydict()
+            yield list(zip(*(["" if v is None else str(v) for v in data[c]] for c in cols)))
+    elif ext in (".csv", ".tsv", ".txt"):
+        import pandas as pd
+        sep = "\t" if ext == ".tsv" else ","
+        for df in pd.read_csv(path, sep=sep, usecols=cols, dtype=str, keep_default_na=False, chunksize=chunk_size):
+            yield list(df[cols].itertuples(index=False, name=None))
+    else:
+        raise SystemExit(f"Unsupported input format: {path} (use .csv, .tsv or .parquet)")
+
+def _pyarrow_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Parquet support needs pyarrow: pip install pyarrow")
+    return pq
+
+# -----------------------------
+# Scoring
+# -----------------------------
+def score_chunk(rows: List[Row]) -> List[Dict]:
+    profiles = [(parse_list(skills), parse_list(interests)) for _, skills, interests in rows]
+    out = []
+    for (name, _, _), recs in zip(rows, recommend_careers_batch(profiles)):
+        courses = course_suggestions(recs)
+        out.append({
+            "name": name,
+            "careers": [career_title(r) for r in recs],
+            "matches": [r.match for r in recs],
+            "skills_missed": [missed_skills(r) for r in recs],
+            "courses": {s: courses[s] for s in sorted(courses)},
+        })
+    return out
+
+def scored_chunks(chunks: Iterator[List[Row]], workers: int) -> Iterator[List[Dict]]:
+    if workers <= 1:
+        for rows in chunks:
+            yield score_chunk(rows)
+        return
+    # Keep only a couple of chunks in flight per worker so the input is never
+    # read ahead of what the pool can score; results come back in input order.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for rows in chunks:
+            pending.append(pool.submit(score_chunk, rows))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# -----------------------------
+# Output
+# -----------------------------
+class JsonlWriter:
+    def __init__(self, path: str):
+        self.f = open(path, "w", encoding="utf-8")
+
+    def write(self, results: List[Dict]):
+        self.f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in results)
+
+    def close(self):
+        self.f.close()
+
+class CsvWriter:
+    def __init__(self, path: str):
+        import csv
+        self.f = open(path, "w", encoding="utf-8", newline="")
+        self.w = csv.writer(self.f)
+        self.w.writerow(["name", "careers", "matches", "skills_missed", "courses"])
+
+    def write(self, results: List[Dict]):
+        # List/dict columns are stored as JSON so they round-trip losslessly
+        self.w.writerows(
+            [r["name"]] + [json.dumps(r[k], ensure_ascii=False) for k in ("careers", "matches", "skills_missed", "courses")]
+            for r in results
+        )
+
+    def close(self):
+        self.f.close()
+
+class ParquetWriter:
+    def __init__(self, path: str):
+        pq = _pyarrow_parquet()
+        import pyarrow as pa
+        self.pa = pa
+        self.schema = pa.schema([
+            ("name", pa.string()),
+            ("careers", pa.list_(pa.string())),
+            ("matches", pa.list_(pa.float64())),
+            ("skills_missed", pa.list_(pa.list_(pa.string()))),
+            ("courses", pa.string()),
+        ])
+        self.w = pq.ParquetWriter(path, self.schema)
+
+    def write(self, results: List[Dict]):
+        rows = [dict(r, courses=json.dumps(r["courses"], ensure_ascii=False)) for r in results]
+        self.w.write_table(self.pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.w.close()
+
+WRITERS = {".jsonl": JsonlWriter, ".json": JsonlWriter, ".csv": CsvWriter, ".parquet": ParquetWriter}
+
+def open_writer(path: str):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in WRITERS:
+        raise SystemExit(f"Unsupported output format: {path} (use .jsonl, .csv or .parquet)")
+    return WRITERS[ext](path)
+
+# -----------------------------
+# Main
+# -----------------------------
+def run(src: str, dst: str, chunk_size: int = 2000, workers: int = 1,
+        cols: List[str] = ("name", "skills", "interests"), progress_every: float = 5.0) -> int:
+    writer = open_writer(dst)
+    start = last = time.perf_counter()
+    total = 0
+    try:
+        for results in scored_chunks(read_chunks(src, chunk_size, list(cols)), workers):
+            writer.write(results)
+            total += len(results)
+            now = time.perf_counter()
+            if now - last >= progress_every:
+                print(f"{total:,} rows  {total / (now - start):,.0f} rows/s", file=sys.stderr)
+                last = now
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    print(f"Scored {total:,} profiles in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s) -> {dst}", file=sys.stderr)
+    return total
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Batch career recommendations for a cohort of profiles.")
+    p.add_argument("input", help="CSV/TSV or Parquet file with name, skills, interests columns")
+    p.add_argument("output", help="Result file (.jsonl, .csv or .parquet)")
+    p.add_argument("--workers", type=int, default=1, help="Scoring processes (default: 1, in-process)")
+    p.add_argument("--chunk-size", type=int, default=2000, help="Profiles scored per vectorized pass")
+    p.add_argument("--name-col", default="name")
+    p.add_argument("--skills-col", default="skills")
+    p.add_argument("--interests-col", default="interests")
+    args = p.parse_args(argv)
+    run(args.input, args.output, args.chunk_size, args.workers,
+        [args.name_col, args.skills_col, args.interests_col])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Randomized check of engine.IncrementalScorer against full scoring.
+
+    python -m benchmarks.check_incremental --careers 5000 --edits 2000
+
+A synthetic catalog (see synth.py) is scored while a profile is edited at
+random: skills and interests added, removed or replaced, sometimes
+cleared. After every edit the scorer's top k must equal
+SkillMatrix.top(SkillMatrix.score(...)) for the same profile, careers and
+scores alike. Popular skills are drawn often, so edits regularly touch
+careers inside the current top k. Exits 1 on any mismatch.
+"""
+import argparse
+import random
+import sys
+from itertools import accumulate
+
+from engine import IncrementalScorer, SkillMatrix
+from benchmarks.synth import make_catalog, skill_names
+
+def normalize(items):
+    return [i.strip().lower() for i in items]
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Check IncrementalScorer against full scoring.")
+    p.add_argument("--careers", type=int, default=5000)
+    p.add_argument("--skills", type=int, default=500)
+    p.add_argument("--edits", type=int, default=2000)
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args(argv)
+    careers, _ = make_catalog(args.careers, args.skills, seed=args.seed)
+    sm = SkillMatrix.from_careers(careers, normalize)
+    rng = random.Random(args.seed + 1)
+    # Mostly known skills, Zipf-weighted; a few the catalog doesn't have
+    names = normalize(skill_names(args.skills)) + ["not-a-skill"]
+    cum = list(accumulate(1.0 / (i + 1) for i in range(len(names))))
+
+    scorer = IncrementalScorer(sm, k=args.k)
+    profile = ([], [])
+    failures = 0
+    for edit in range(args.edits):
+        kind = rng.randrange(2)
+        items = list(profile[kind])
+        roll = rng.random()
+        if roll < 0.05:
+            items = []
+        elif roll < 0.5 or not items:
+            items.append(rng.choices(names, cum_weights=cum)[0])
+        elif roll < 0.8:
+            items.remove(rng.choice(items))
+        else:
+            items[rng.randrange(len(items))] = rng.choices(names, cum_weights=cum)[0]
+        profile = (items, profile[1]) if kind == 0 else (profile[0], items)
+        scorer.update(*profile)
+        want = sm.top(sm.score(*profile), k=args.k)
+        got = scorer.top()
+        if got != want:
+            failures += 1
+            print(f"edit {edit}: profile={profile}\n  incremental {got}\n  full        {want}")
+    print(f"{args.edits} edits over {args.careers} careers, {failures} failures")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
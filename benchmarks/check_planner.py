@@ -0,0 +1,67 @@
+"""Randomized check of planner.plan against brute force.
+
+    python -m benchmarks.check_planner --cases 2000
+
+Small random multicover instances (a few targets, up to a dozen skills)
+are solved by plan() and by trying every skill subset in order of size.
+Every plan must cover each target's need, and a plan reported as exact
+(branch and bound finished, or greedy met the lower bound) must be as
+small as the brute-force optimum. Exits 1 on any mismatch.
+"""
+import argparse
+import random
+import sys
+from itertools import combinations
+from typing import List, Optional, Sequence
+
+from planner import plan
+
+def covers(chosen: Sequence[int], missing: Sequence[Sequence[int]], need: Sequence[int]) -> bool:
+    picked = set(chosen)
+    return all(len(picked.intersection(m)) >= n for m, n in zip(missing, need))
+
+def brute_force(missing: Sequence[Sequence[int]], need: Sequence[int]) -> Optional[int]:
+    # Size of the smallest covering skill set, or None if there is none
+    skills = sorted({s for m in missing for s in m})
+    for size in range(len(skills) + 1):
+        if any(covers(c, missing, need) for c in combinations(skills, size)):
+            return size
+    return None
+
+def random_case(rng: random.Random, max_targets: int, max_skills: int):
+    n_skills = rng.randint(1, max_skills)
+    missing: List[List[int]] = []
+    need: List[int] = []
+    for _ in range(rng.randint(1, max_targets)):
+        m = rng.sample(range(n_skills), rng.randint(0, n_skills))
+        missing.append(m)
+        need.append(rng.randint(0, len(m)))
+    return missing, need
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Check the skill planner against brute force.")
+    p.add_argument("--cases", type=int, default=2000)
+    p.add_argument("--targets", type=int, default=6, help="Most targets per case")
+    p.add_argument("--skills", type=int, default=12, help="Most distinct skills per case")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args(argv)
+    rng = random.Random(args.seed)
+    failures = exact = 0
+    for case in range(args.cases):
+        missing, need = random_case(rng, args.targets, args.skills)
+        result = plan(missing, need)
+        best = brute_force(missing, need)
+        problem = None
+        if not covers(result.skills, missing, need):
+            problem = "plan doesn't qualify every target"
+        elif result.exact and len(result.skills) != best:
+            problem = f"exact plan has {len(result.skills)} skills, optimum is {best}"
+        if problem:
+            failures += 1
+            print(f"case {case}: {problem}: missing={missing} need={need} plan={result.skills}")
+        exact += result.exact
+    print(f"{args.cases} cases, {exact} proven exact, {failures} failures")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""Many simulated students using app.py at once, headlessly.
+
+    python -m benchmarks.load                                  # scenarios/default.json
+    python -m benchmarks.load --scenario my.json --sessions 50 --concurrency 16
+    python -m benchmarks.run compare old.json new.json         # same result format
+
+Each session is a Streamlit AppTest (its own session state) driven through
+the scenario's steps: fill the Home profile, open tabs, page through
+matches and ask Q&A questions. Every step is one rerun. AppTest shares a
+process-global runtime, so it can't run concurrently within a process:
+sessions are spread over `concurrency` worker processes, each running its
+own sessions one after another, for `rounds` passes over the steps. Like a
+multi-worker deployment, the workers don't share caches or indexes.
+Profiles and questions are picked by session and round, so a scenario
+file always replays the same traffic.
+
+Reported: per-rerun latency p50/p95/p99 (overall and per step, measured
+around AppTest.run, so it includes the harness), reruns per second, the
+app's own `rerun` stage from METRICS (merged over the workers), and
+memory: worker resident set growth for the first round (cost of a new
+session) and for each later round (growth of a live session, ideally ~0),
+both per session. A rerun that raises in the app is an error, not a
+latency sample, and any error makes the run exit 1.
+"""
+import argparse
+import gc
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+import multiprocessing
+from typing import Dict, List, Optional
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+DEFAULT_SCENARIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios", "default.json")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+HOME = "🏠 Home"
+
+def rss_mb() -> float:
+    # Current resident set (Linux); peak RSS elsewhere
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+# -----------------------------
+# Sessions
+# -----------------------------
+class Session:
+    def __init__(self, n: int, scenario: Dict):
+        self.n, self.scenario = n, scenario
+        self.at = None
+        self.tab = HOME
+        self.visits = 0
+        self.timings: List[tuple] = []   # (step, seconds)
+        self.errors: List[str] = []
+
+    def _run(self, step: str, tab: str):
+        # AppTest doesn't keep the open tab between runs, so it is set each time
+        self.at.session_state["tab"] = tab
+        t0 = time.perf_counter()
+        self.at.run()
+        seconds = time.perf_counter() - t0
+        if self.at.exception:
+            self.errors.append(f"session {self.n} {step}: {self.at.exception[0].value}")
+        else:
+            self.timings.append((step, seconds))
+
+    def _text_input(self, label: str):
+        return next(t for t in self.at.text_input if t.label.startswith(label))
+
+    def round(self, r: int):
+        from streamlit.testing.v1 import AppTest
+        sc = self.scenario
+        if self.at is None:
+            self.at = AppTest.from_file(APP, default_timeout=sc.get("timeout_s", 120))
+            self._run("open", HOME)
+        for step in sc["steps"]:
+            do = step["do"]
+            try:
+                if do == "profile":
+                    p = sc["profiles"][(self.n + r) % len(sc["profiles"])]
+                    if self.tab != HOME:
+                        self._run("tab", HOME)
+                        self.tab = HOME
+                    self.at.text_input(key="in_name").input(p["name"])
+                    self.at.text_input(key="in_skills").input(p["skills"])
+                    self.at.text_input(key="in_interests").input(p["interests"])
+                    self._run(do, HOME)
+                elif do == "tab":
+                    self.tab = step["tab"]
+                    self._run(do, self.tab)
+                elif do == "next_page":
+                    nxt = [b for b in self.at.button if b.label.startswith("Next") and not b.disabled]
+                    if nxt:
+                        nxt[0].click()
+                    self._run(do, self.tab)
+                elif do == "ask":
+                    q = sc["questions"][(self.n + self.visits) % len(sc["questions"])]
+                    self.visits += 1
+                    self._text_input("Your question").input(q)
+                    next(b for b in self.at.button if b.label == "Ask").click()
+                    self._run(do, self.tab)
+                else:
+                    raise ValueError(f"Unknown step {do!r}")
+            except (StopIteration, KeyError, ValueError) as exc:
+                self.errors.append(f"session {self.n} {do}: {type(exc).__name__} {exc}")
+
+# -----------------------------
+# Run
+# -----------------------------
+def _pcts(seconds: List[float]) -> Dict[str, float]:
+    ms = np.asarray(seconds) * 1e3
+    return {"count": len(ms), "mean_ms": float(ms.mean()), "p50_ms": float(np.percentile(ms, 50)),
+            "p95_ms": float(np.percentile(ms, 95)), "p99_ms": float(np.percentile(ms, 99)), "max_ms": float(ms.max())}
+
+def _worker(conn, ids: List[int], scenario: Dict):
+    # One process: a warm-up session (imports, index builds and the Q&A
+    # stack aren't counted), then its sessions in turn for each round
+    # the parent asks for
+    warm = Session(-1, scenario)
+    warm.round(0)
+    from metrics import METRICS
+    METRICS.stages.pop("rerun", None)
+    sessions = [Session(n, scenario) for n in ids]
+    gc.collect()
+    conn.send({"rss": rss_mb(), "errors": [f"warm-up {e}" for e in warm.errors]})
+    while True:
+        r = conn.recv()
+        if r is None:
+            break
+        for s in sessions:
+            s.timings, s.errors = [], []
+            s.round(r)
+        gc.collect()
+        conn.send({"rss": rss_mb(), "timings": [t for s in sessions for t in s.timings],
+                   "errors": [e for s in sessions for e in s.errors]})
+    h = METRICS.stages.get("rerun")
+    conn.send((h.counts, h.sum, h.count) if h else None)
+    conn.close()
+
+def _rerun_stage(parts: List[Optional[tuple]]) -> Optional[Dict[str, float]]:
+    # The workers' METRICS "rerun" histograms, merged
+    from metrics import Histogram
+    h = Histogram()
+    for part in filter(None, parts):
+        counts, total, count = part
+        h.counts = [a + b for a, b in zip(h.counts, counts)]
+        h.sum += total
+        h.count += count
+    if not h.count:
+        return None
+    return {"count": h.count, "mean_ms": h.sum / h.count * 1e3,
+            "p50_ms": h.quantile(0.5) * 1e3, "p95_ms": h.quantile(0.95) * 1e3}
+
+def run(scenario: Dict, log=print) -> Dict:
+    n_sessions, rounds = scenario["sessions"], scenario.get("rounds", 1)
+    n_workers = max(1, min(scenario.get("concurrency", 4), n_sessions))
+    ctx = multiprocessing.get_context("spawn")
+    workers = []
+    for w in range(n_workers):
+        parent, child = ctx.Pipe()
+        proc = ctx.Process(target=_worker, args=(child, list(range(w, n_sessions, n_workers)), scenario),
+                           name=f"session-worker-{w}", daemon=True)
+        proc.start()
+        workers.append((proc, parent))
+    errors: List[str] = []
+    timings: List[tuple] = []
+    try:
+        ready = [conn.recv() for _, conn in workers]
+        errors += [e for msg in ready for e in msg["errors"]]
+        # Summed over the workers: the resident set of the whole "deployment"
+        rss = [sum(msg["rss"] for msg in ready)]
+        t_start = time.perf_counter()
+        walls = []
+        for r in range(rounds):
+            t0 = time.perf_counter()
+            for _, conn in workers:
+                conn.send(r)
+            done = [conn.recv() for _, conn in workers]
+            walls.append(time.perf_counter() - t0)
+            for msg in done:
+                timings += msg["timings"]
+                errors += msg["errors"]
+            rss.append(sum(msg["rss"] for msg in done))
+            log(f"round {r + 1}/{rounds}: {walls[-1]:.2f}s, rss {rss[-1]:.1f} MB over {n_workers} workers")
+        wall = time.perf_counter() - t_start
+        for _, conn in workers:
+            conn.send(None)
+        app = _rerun_stage([conn.recv() for _, conn in workers])
+    finally:
+        for proc, _ in workers:
+            proc.join(timeout=30)
+            if proc.is_alive():
+                proc.terminate()
+    failed = [proc.name for proc, _ in workers if proc.exitcode not in (0, None)]
+    errors += [f"{name} exited with an error" for name in failed]
+
+    by_step: Dict[str, List[float]] = {}
+    for step, seconds in timings:
+        by_step.setdefault(step, []).append(seconds)
+    results = []
+    if timings:
+        results.append({"kind": "latency", "size": n_sessions, "name": "rerun", **_pcts([t for _, t in timings]),
+                        "throughput_per_s": len(timings) / wall})
+    results += [{"kind": "latency", "size": n_sessions, "name": f"rerun:{step}", **_pcts(secs),
+                 "throughput_per_s": len(secs) / wall} for step, secs in sorted(by_step.items())]
+    growth = [(b - a) / n_sessions for a, b in zip(rss, rss[1:])]
+    return {
+        "results": results,
+        "app_rerun_stage": app,
+        "memory": {"rss_mb": rss, "new_session_kb": growth[0] * 1024 if growth else 0.0,
+                   "per_round_kb": [g * 1024 for g in growth[1:]]},
+        "sessions": n_sessions, "workers": n_workers, "rounds": rounds, "wall_s": wall, "round_wall_s": walls,
+        "errors": errors,
+    }
+
+def _fmt(r: Dict) -> str:
+    return (f"{r['name']:<18} n {r['count']:5d}  p50 {r['p50_ms']:8.1f}  p95 {r['p95_ms']:8.1f}"
+            f"  p99 {r['p99_ms']:8.1f} ms  {r['throughput_per_s']:7.1f}/s")
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Load-test app.py with many concurrent AppTest sessions.")
+    p.add_argument("--scenario", default=DEFAULT_SCENARIO)
+    p.add_argument("--sessions", type=int, help="Override the scenario's session count")
+    p.add_argument("--concurrency", type=int, help="Override the scenario's concurrency")
+    p.add_argument("--rounds", type=int, help="Override the scenario's rounds")
+    p.add_argument("--out", help="Result file (default: benchmarks/results/load-<time>-<git>.json)")
+    args = p.parse_args(argv)
+    with open(args.scenario, "rb") as f:
+        raw = f.read()
+    scenario = json.loads(raw)
+    for key in ("sessions", "concurrency", "rounds"):
+        if getattr(args, key) is not None:
+            scenario[key] = getattr(args, key)
+    # Before app.py (and advisor) are first imported by the warm-up session
+    os.environ.update(scenario.get("env", {}))
+    sys.path.insert(0, ROOT)
+    from benchmarks.run import _git_rev
+
+    report = run(scenario, log=lambda msg: print(msg, file=sys.stderr))
+    for r in report["results"]:
+        print(_fmt(r))
+    app, mem = report["app_rerun_stage"], report["memory"]
+    if app:
+        print(f"app rerun stage      mean {app['mean_ms']:.1f} ms  p50 ≤{app['p50_ms']:g}  p95 ≤{app['p95_ms']:g} ms (buckets)")
+    print(f"memory per session   new {mem['new_session_kb']:.0f} KB  later rounds "
+          + ", ".join(f"{g:.0f}" for g in mem["per_round_kb"]) + " KB")
+    if report["errors"]:
+        print(f"{len(report['errors'])} errors (run failed), first: {report['errors'][0]}")
+
+    report["meta"] = {
+        "git": _git_rev(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+        "platform": platform.platform(), "cpus": os.cpu_count(),
+        "scenario": scenario.get("name"), "scenario_sha256": hashlib.sha256(raw).hexdigest()[:16],
+        "params": {k: scenario.get(k) for k in ("sessions", "concurrency", "rounds")},
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"load-{time.strftime('%Y%m%d-%H%M%S')}-{report['meta']['git']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"Wrote {out}", file=sys.stderr)
+    sys.exit(1 if report["errors"] else 0)
+
+if __name__ == "__main__":
+    main()
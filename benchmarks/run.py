@@ -0,0 +1,184 @@
+"""Offline scaling benchmarks for the advisor core.
+
+    python -m benchmarks.run --sizes 1000,10000,100000
+    python -m benchmarks.run compare benchmarks/results/old.json benchmarks/results/new.json
+
+For each catalog size a synthetic KB is generated and installed through
+the normal KB reload path, then recommend_careers (cold and cached),
+recommend_careers_batch, course_suggestions, build_kb_texts and qa_answer
+(cold and cached) are timed. Index builds are timed separately. Peak memory comes from a second,
+tracemalloc-instrumented pass so it doesn't distort the latencies.
+Results are written as JSON, one record per (size, name).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+import advisor
+from engine import SkillMatrix
+from kb import BuiltinSource
+from qa import build_qa_index
+from benchmarks.synth import make_catalog, make_profiles, make_queries
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+def _git_rev() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+def peak_mb(fn: Callable[[], object]) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+def latency(name: str, size: int, fn: Callable, args: List, memory: bool, per_call: int = 1) -> Dict:
+    # per_call: items processed per call, for throughput of batch APIs
+    times = []
+    for a in args:
+        t = time.perf_counter()
+        fn(a)
+        times.append(time.perf_counter() - t)
+    ms = np.array(times) * 1e3
+    rec = {
+        "size": size, "name": name, "kind": "latency", "calls": len(times),
+        "p50_ms": float(np.percentile(ms, 50)), "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)), "mean_ms": float(ms.mean()),
+        "throughput_per_s": len(times) * per_call / max(sum(times), 1e-12),
+    }
+    if memory:
+        rec["peak_mb"] = peak_mb(lambda: [fn(a) for a in args[:20]])
+    return rec
+
+def build(name: str, size: int, fn: Callable[[], object], memory: bool) -> Dict:
+    t = time.perf_counter()
+    fn()
+    rec = {"size": size, "name": name, "kind": "build", "seconds": time.perf_counter() - t}
+    if memory:
+        rec["peak_mb"] = peak_mb(fn)
+    return rec
+
+def bench_size(size: int, args) -> List[Dict]:
+    t = time.perf_counter()
+    careers, courses = make_catalog(size, n_skills=args.skills, roadmap_len=args.roadmap_len, seed=args.seed)
+    profiles = make_profiles(args.profiles, args.skills, seed=args.seed + 1)
+    queries = make_queries(careers, args.queries, seed=args.seed + 2)
+    print(f"[{size:,}] generated catalog in {time.perf_counter() - t:.1f}s", file=sys.stderr)
+    mem = not args.no_memory
+    out = []
+
+    # Index builds, timed in isolation
+    out.append(build("skill_matrix_build", size, lambda: SkillMatrix.from_careers(careers, advisor.normalize), mem))
+    out.append(build("build_kb_texts", size, lambda: advisor.build_kb_texts(careers), mem))
+    docs, labels = advisor.build_kb_texts(careers)
+    out.append(build("qa_index_build", size, lambda: build_qa_index(docs, labels), mem))
+    out.append(build("kb_install", size, lambda: advisor.KB.use(BuiltinSource(careers, courses)), False))
+    advisor.qa_indexes()
+
+    # Scoring is timed with an empty result cache; cache hits separately
+    def uncached(fn):
+        def call(a):
+            advisor.RESULT_CACHE.clear()
+            return fn(a)
+        return call
+    out.append(latency("recommend_careers", size, uncached(lambda p: advisor.recommend_careers("", *p)), profiles, mem))
+    chunks = [profiles[i:i + args.batch] for i in range(0, len(profiles), args.batch)]
+    out.append(latency("recommend_careers_batch", size, uncached(advisor.recommend_careers_batch), chunks, mem,
+                       per_call=args.batch))
+    recs = [advisor.recommend_careers("", *p) for p in profiles]
+    out.append(latency("recommend_careers_cached", size, lambda p: advisor.recommend_careers("", *p), profiles, False))
+    out.append(latency("course_suggestions", size, uncached(advisor.course_suggestions), recs, mem))
+
+    def cold(q):
+        advisor.QA_CACHE.clear()
+        return advisor.qa_answer(q)
+    out.append(latency("qa_answer_cold", size, cold, queries, mem))
+    for q in queries:
+        advisor.qa_answer(q)
+    out.append(latency("qa_answer_cached", size, advisor.qa_answer, queries, False))
+    for r in out:
+        print(f"[{size:,}] {_fmt(r)}", file=sys.stderr)
+    return out
+
+def _fmt(r: Dict) -> str:
+    if r["kind"] == "build":
+        s = f"{r['name']:<26} {r['seconds'] * 1e3:10.1f} ms"
+    else:
+        s = (f"{r['name']:<26} p50 {r['p50_ms']:8.3f}  p95 {r['p95_ms']:8.3f}  p99 {r['p99_ms']:8.3f} ms"
+             f"  {r['throughput_per_s']:10.0f}/s")
+    return s + (f"  peak {r['peak_mb']:.1f} MB" if "peak_mb" in r else "")
+
+def run(args):
+    sizes = [int(s) for s in args.sizes.split(",")]
+    results = []
+    for size in sizes:
+        results.extend(bench_size(size, args))
+    report = {
+        "meta": {
+            "git": _git_rev(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "numpy": np.__version__, "platform": platform.platform(), "cpus": os.cpu_count(),
+            "params": {k: v for k, v in vars(args).items() if k != "func"},
+        },
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['meta']['git']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"Wrote {out}", file=sys.stderr)
+
+def compare(args):
+    # Ratio new/old of p95 latency (or build seconds) for every shared record
+    def load(path):
+        with open(path, encoding="utf-8") as f:
+            return {(r["size"], r["name"]): r for r in json.load(f)["results"]}
+    old, new = load(args.old), load(args.new)
+    worse = 0
+    for key in sorted(old.keys() & new.keys()):
+        metric = "seconds" if old[key]["kind"] == "build" else "p95_ms"
+        a, b = old[key][metric], new[key][metric]
+        ratio = b / a if a else float("inf")
+        flag = "  REGRESSION" if ratio > args.threshold else ""
+        worse += bool(flag)
+        print(f"{key[0]:>9,} {key[1]:<26} {metric:<8} {a:10.3f} -> {b:10.3f}  x{ratio:5.2f}{flag}")
+    return 1 if worse else 0
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark the advisor core on synthetic catalogs.")
+    sub = p.add_subparsers(dest="cmd")
+    r = sub.add_parser("run", help="Run the benchmarks (default)")
+    c = sub.add_parser("compare", help="Compare two result files")
+    c.add_argument("old")
+    c.add_argument("new")
+    c.add_argument("--threshold", type=float, default=1.2, help="Flag ratios above this (default 1.2)")
+    for q in (p, r):
+        q.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated career counts")
+        q.add_argument("--skills", type=int, default=2000, help="Skill vocabulary size")
+        q.add_argument("--roadmap-len", type=int, default=5)
+        q.add_argument("--profiles", type=int, default=500, help="User profiles per size")
+        q.add_argument("--queries", type=int, default=300, help="Q&A questions per size")
+        q.add_argument("--batch", type=int, default=100, help="Profiles per recommend_careers_batch call")
+        q.add_argument("--seed", type=int, default=0)
+        q.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+        q.add_argument("--out", help="Result file (default: benchmarks/results/<time>-<git>.json)")
+    args = p.parse_args(argv)
+    if args.cmd == "compare":
+        sys.exit(compare(args))
+    run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Cold-start timing for the Streamlit app, with and without the Q&A stack.
+
+    python -m benchmarks.startup --repeat 5
+
+Each run is a fresh interpreter that renders app.py headlessly with
+Streamlit's AppTest, then asks one question. Modes map to
+ADVISOR_QA_STARTUP: "eager" loads scikit-learn and builds the Q&A index
+before the first render (the original behaviour), "lazy" waits for the
+first question and "background" warms it in a thread after the first
+render.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=300).run()
+t2 = time.perf_counter()
+sklearn_at_render = "sklearn" in sys.modules
+# Only the open tab renders; AppTest doesn't keep the tab between runs
+at.session_state["tab"] = "💬 Q&A"
+at.run()
+next(t for t in at.text_input if t.label.startswith("Your question")).input("What skills do I need for Data Engineer?")
+at.session_state["tab"] = "💬 Q&A"
+next(b for b in at.button if b.label == "Ask").click().run()
+t3 = time.perf_counter()
+print(json.dumps({
+    "harness_import_s": t1 - t0, "first_render_s": t2 - t1, "first_answer_s": t3 - t2,
+    "sklearn_at_render": sklearn_at_render, "error": bool(at.exception),
+}))
+"""
+
+def run_once(mode: str) -> dict:
+    env = dict(os.environ, ADVISOR_QA_STARTUP=mode)
+    t = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", CHILD, APP], env=env, capture_output=True, text=True,
+                          cwd=os.path.dirname(APP))
+    wall = time.perf_counter() - t
+    if proc.returncode != 0:
+        raise SystemExit(f"{mode} run failed:\n{proc.stderr}")
+    rec = json.loads(proc.stdout.strip().splitlines()[-1])
+    rec["process_s"] = wall
+    return rec
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Measure time-to-first-render of app.py.")
+    p.add_argument("--modes", default="eager,lazy,background")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--out", help="Also write the raw runs as JSON")
+    args = p.parse_args(argv)
+    runs = {}
+    for mode in args.modes.split(","):
+        runs[mode] = [run_once(mode) for _ in range(args.repeat)]
+        med = {k: statistics.median(r[k] for r in runs[mode]) for k in ("first_render_s", "first_answer_s", "process_s")}
+        print(f"{mode:<11} first render {med['first_render_s'] * 1e3:8.0f} ms   first answer {med['first_answer_s'] * 1e3:8.0f} ms"
+              f"   process {med['process_s'] * 1e3:8.0f} ms   sklearn at render: {runs[mode][0]['sklearn_at_render']}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(runs, f, indent=1)
+
+if __name__ == "__main__":
+    main()
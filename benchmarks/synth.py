@@ -0,0 +1,78 @@
+"""Synthetic CAREERS-shaped catalogs, user profiles and Q&A questions.
+
+Skill popularity is Zipf-like, so a handful of skills ("Skill-0",
+"Skill-1", ...) appear in many careers, as Python and SQL do in the real
+catalog. Everything is seeded and reproducible.
+"""
+import random
+from itertools import accumulate
+from typing import Dict, List, Tuple
+
+_WORDS = (
+    "build deploy analyze design maintain data cloud systems models pipelines apps secure "
+    "scalable web mobile products users metrics research infrastructure automation networks "
+    "experiments dashboards services platforms teams insights reliability performance"
+).split()
+_ROLES = ["Engineer", "Analyst", "Developer", "Scientist", "Designer", "Specialist", "Architect", "Consultant"]
+
+def skill_names(n_skills: int) -> List[str]:
+    return [f"Skill-{i}" for i in range(n_skills)]
+
+def _zipf_weights(n: int, s: float = 1.1) -> List[float]:
+    return [1.0 / (i + 1) ** s for i in range(n)]
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n)).capitalize()
+
+def make_catalog(n_careers: int, n_skills: int = 2000, roadmap_len: int = 5,
+                 skills_per_career: Tuple[int, int] = (3, 8), courses_share: float = 0.3,
+                 seed: int = 0) -> Tuple[Dict[str, Dict], Dict[str, List[str]]]:
+    rng = random.Random(seed)
+    skills = skill_names(n_skills)
+    cum = list(accumulate(_zipf_weights(n_skills)))
+    careers: Dict[str, Dict] = {}
+    for i in range(n_careers):
+        k = rng.randint(*skills_per_career)
+        chosen = list(dict.fromkeys(rng.choices(skills, cum_weights=cum, k=k)))
+        lo = rng.randint(3, 10)
+        careers[f"{rng.choice(_WORDS).capitalize()} {rng.choice(_ROLES)} {i}"] = {
+            "skills": chosen,
+            "description": f"{_sentence(rng, 10)} using {', '.join(chosen[:3])}.",
+            "roadmap": [f"{_sentence(rng, 4)} with {rng.choice(chosen)}" for _ in range(roadmap_len)],
+            "salary": f"₹{lo}–{lo + rng.randint(2, 15)} LPA in India",
+        }
+    courses = {
+        s: [f"{s} Crash Course", f"Intro to {s} (free)"]
+        for s in skills if rng.random() < courses_share
+    }
+    return careers, courses
+
+def make_profiles(n: int, n_skills: int, seed: int = 1, max_skills: int = 6,
+                  max_interests: int = 3) -> List[Tuple[List[str], List[str]]]:
+    rng = random.Random(seed)
+    skills = skill_names(n_skills)
+    cum = list(accumulate(_zipf_weights(n_skills)))
+    out = []
+    for _ in range(n):
+        s = rng.choices(skills, cum_weights=cum, k=rng.randint(1, max_skills))
+        it = rng.choices(skills, cum_weights=cum, k=rng.randint(0, max_interests))
+        # Profiles arrive the way the form sends them: mixed case, stray spaces
+        out.append(([f" {x.upper()}" if rng.random() < 0.2 else x for x in s], it))
+    return out
+
+def make_queries(careers: Dict[str, Dict], n: int, seed: int = 2) -> List[str]:
+    rng = random.Random(seed)
+    titles = list(careers)
+    templates = [
+        "What skills do I need for {title}?",
+        "salary of {title}",
+        "How do I become a {title}",
+        "how to learn {skill}",
+        "{skill} and {skill2} jobs",
+    ]
+    out = []
+    for _ in range(n):
+        title = rng.choice(titles)
+        skills = careers[title]["skills"]
+        out.append(rng.choice(templates).format(title=title, skill=rng.choice(skills), skill2=rng.choice(skills)))
+    return out
@@ -0,0 +1,186 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+_MISSING = object()
+
+def approx_size(obj: Any) -> int:
+    # Bytes of an object and everything it contains (tuples, lists, dicts,
+    # NamedTuples); shared objects are counted each time they appear
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (tuple, list, set, frozenset)):
+        size += sum(approx_size(x) for x in obj)
+    elif isinstance(obj, (dict, MappingProxyType)):
+        size += sum(approx_size(k) + approx_size(v) for k, v in obj.items())
+    return size
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = self.error = None
+
+class LRUCache:
+    # Bounded, thread-safe LRU with an optional per-entry TTL (seconds).
+    # get_or_compute is single-flight: concurrent callers missing on the same
+    # key wait for the first one's result instead of computing it again.
+    # With sizeof, the approximate memory held by keys and values is tracked.
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic,
+                 sizeof: Optional[Callable[[Any], int]] = None):
+        self.maxsize, self.ttl, self.clock, self.sizeof = maxsize, ttl, clock, sizeof
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        # Bumped by clear(), so computations started before it aren't stored
+        self._generation = 0
+        self.hits = self.misses = self.evictions = self.expirations = self.coalesced = 0
+        self.bytes = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                expires, value, size = item
+                if expires is None or expires > self.clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.bytes -= size
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        self._put(key, value, None)
+
+    def _put(self, key: Hashable, value: Any, generation: Optional[int]):
+        if self.maxsize <= 0:
+            return
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        size = self.sizeof(key) + self.sizeof(value) if self.sizeof else 0
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            self._data[key] = (expires, value, size)
+            self.bytes += size
+            while len(self._data) > self.maxsize:
+                _, (_, _, dropped) = self._data.popitem(last=False)
+                self.bytes -= dropped
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                generation = self._generation
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = compute()
+            self._put(key, flight.value, generation)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def get_or_compute_many(self, keys: Sequence[Hashable], compute: Callable[[List[int]], List[Any]]) -> List[Any]:
+        # get_or_compute for a batch: each distinct key is looked up once, and
+        # the misses nobody else is computing are computed together by
+        # compute(positions of their first occurrence in keys), which returns
+        # one value per position. Misses already in flight elsewhere are
+        # waited for; repeats within the batch count as hits.
+        first: Dict[Hashable, int] = {}
+        for n, key in enumerate(keys):
+            first.setdefault(key, n)
+        values: Dict[Hashable, Any] = {}
+        for key in first:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                values[key] = value
+        lead: Dict[Hashable, _Flight] = {}
+        wait: Dict[Hashable, _Flight] = {}
+        with self._lock:
+            self.hits += len(keys) - len(first)
+            generation = self._generation
+            for key in first:
+                if key in values:
+                    continue
+                item = self._data.get(key)
+                if item is not None and (item[0] is None or item[0] > self.clock()):
+                    # Stored by another caller since the lookup above
+                    values[key] = item[1]
+                elif key in self._inflight:
+                    wait[key] = self._inflight[key]
+                    self.coalesced += 1
+                else:
+                    lead[key] = self._inflight[key] = _Flight()
+        if lead:
+            # Computed before waiting on anyone, so two batches waiting on
+            # each other's keys can't deadlock
+            try:
+                for key, value in zip(lead, compute([first[key] for key in lead])):
+                    lead[key].value = values[key] = value
+                    self._put(key, value, generation)
+            except BaseException as exc:
+                for flight in lead.values():
+                    flight.error = exc
+                raise
+            finally:
+                with self._lock:
+                    for key in lead:
+                        self._inflight.pop(key, None)
+                for flight in lead.values():
+                    flight.done.set()
+        for key, flight in wait.items():
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            values[key] = flight.value
+        return [values[key] for key in keys]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+            self._generation += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes": self.bytes,
+            }
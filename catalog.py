@@ -0,0 +1,101 @@
+"""Compact, interned view of the career catalog.
+
+Career titles and skill names are interned once per process in append-only
+symbol tables, so their integer ids stay valid across KB reloads and a
+recommendation can be stored as a small (career_id, match, missing skill
+ids) tuple. Text is looked up from the ids only when a view renders it.
+"""
+import re
+import sys
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+class Symbols:
+    # Append-only string ↔ id table; ids are never reused or reassigned
+    def __init__(self, key: Optional[Callable[[str], str]] = None):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        # Optional derived key per id (e.g. the lowercased skill), computed once
+        self.key = key
+        self.keys: List[str] = []
+        self._lock = threading.Lock()
+
+    def intern(self, name: str) -> int:
+        i = self.ids.get(name)
+        if i is None:
+            with self._lock:
+                i = self.ids.get(name)
+                if i is None:
+                    name = sys.intern(name)
+                    i = len(self.names)
+                    self.names.append(name)
+                    if self.key is not None:
+                        self.keys.append(sys.intern(self.key(name)))
+                    self.ids[name] = i
+        return i
+
+    def name(self, i: int) -> str:
+        return self.names[i]
+
+    def __len__(self):
+        return len(self.names)
+
+CAREER_IDS = Symbols()
+# Skills keep their display spelling; the key is what "already have" compares
+SKILL_IDS = Symbols(key=str.lower)
+
+class Match(NamedTuple):
+    career: int
+    match: float
+    missing: Tuple[int, ...]
+
+# "₹6–20 LPA in India", "₹4.5 - 9 LPA", "₹12 LPA+" → (6.0, 20.0), (4.5, 9.0), (12.0, 12.0)
+_SALARY = re.compile(r"(\d+(?:\.\d+)?)(?:\s*(?:–|—|-|to)\s*(\d+(?:\.\d+)?))?")
+
+def parse_salary(text: str) -> Tuple[float, float]:
+    m = _SALARY.search(text or "")
+    if not m:
+        return float("nan"), float("nan")
+    lo = float(m.group(1))
+    return lo, float(m.group(2)) if m.group(2) else lo
+
+class Catalog:
+    # Per-snapshot columns over the interned ids. Row i is the i-th career of
+    # the snapshot, the same row order as the SkillMatrix built from it.
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        careers = snapshot.careers
+        self.career_ids = np.fromiter((CAREER_IDS.intern(t) for t in careers), dtype=np.int32, count=len(careers))
+        self.row_of: Dict[int, int] = {cid: row for row, cid in enumerate(self.career_ids.tolist())}
+        ptr, flat = [0], []
+        for info in careers.values():
+            flat.extend(SKILL_IDS.intern(s) for s in info.skills)
+            ptr.append(len(flat))
+        # Skill ids per career in CSR layout, in the catalog's own order
+        self.skill_ptr = np.asarray(ptr, dtype=np.int64)
+        self.skill_ids = np.asarray(flat, dtype=np.int32)
+        self._salary: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def __len__(self):
+        return len(self.career_ids)
+
+    def skills_of(self, row: int) -> List[int]:
+        return self.skill_ids[self.skill_ptr[row]:self.skill_ptr[row + 1]].tolist()
+
+    def match(self, row: int, match: float, have: Set[str]) -> Match:
+        keys = SKILL_IDS.keys
+        return Match(int(self.career_ids[row]), match, tuple(s for s in self.skills_of(row) if keys[s] not in have))
+
+    def salary(self) -> Tuple[np.ndarray, np.ndarray]:
+        # (min, max) LPA per row, NaN where the text has no number. Needs
+        # every career's details, so it is parsed on first use only.
+        if self._salary is None:
+            self.snapshot.details.prefetch(self.snapshot.careers)
+            pairs = [parse_salary(info["salary"]) for info in self.snapshot.careers.values()]
+            lo = np.fromiter((p[0] for p in pairs), dtype=np.float32, count=len(pairs))
+            hi = np.fromiter((p[1] for p in pairs), dtype=np.float32, count=len(pairs))
+            self._salary = (lo, hi)
+        return self._salary
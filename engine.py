@@ -0,0 +1,218 @@
+import numpy as np
+from typing import List, Dict, Iterable, Optional, Set, Tuple
+from scipy import sparse
+
+SKILL_WEIGHT = 0.8
+INTEREST_WEIGHT = 0.2
+INTEREST_DAMPING = 0.5
+# Rounded match values are equal only if the raw scores are within 0.1%.
+_TIE_SLACK = 0.001
+
+# -----------------------------
+# Career x skill incidence matrix
+# -----------------------------
+class SkillMatrix:
+    def __init__(self, titles: List[str], skill_lists: Iterable[List[str]]):
+        # skill_lists must already be normalized (stripped + lowercased)
+        vocab: Dict[str, int] = {}
+        rows = [sorted({vocab.setdefault(s, len(vocab)) for s in skills}) for skills in skill_lists]
+        self._assemble(titles, vocab, rows)
+
+    def _assemble(self, titles: List[str], vocab: Dict[str, int], rows: List):
+        self.titles = list(titles)
+        self.vocab = vocab
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(r) for r in rows], out=indptr[1:])
+        indices = np.concatenate([np.asarray(r, dtype=np.int32) for r in rows]) if rows else np.zeros(0, dtype=np.int32)
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(indices)), indices, indptr),
+            shape=(len(self.titles), len(self.vocab)),
+        )
+        self._derive()
+
+    @classmethod
+    def from_arrays(cls, titles: List[str], vocab: Dict[str, int], data: np.ndarray,
+                    indices: np.ndarray, indptr: np.ndarray) -> "SkillMatrix":
+        # Wrap saved CSR arrays (e.g. read-only memory maps, see index_store.py)
+        # without copying them
+        out = cls.__new__(cls)
+        out.titles, out.vocab = list(titles), vocab
+        out.matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(titles), len(vocab)), copy=False)
+        out._derive()
+        return out
+
+    def _derive(self):
+        self.row_len = np.diff(self.matrix.indptr).astype(np.float64)
+        self._by_skill: Optional[sparse.csc_matrix] = None
+        self._reach: Optional[np.ndarray] = None
+        self._gains: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_careers(cls, careers: Dict[str, Dict], normalize) -> "SkillMatrix":
+        return cls(list(careers), (normalize(info["skills"]) for info in careers.values()))
+
+    def updated(self, titles: List[str], changed: Dict[str, List[str]]) -> "SkillMatrix":
+        # Matrix for a reloaded catalog: rows of unchanged careers are copied
+        # over, only careers in `changed` (normalized skills) are re-interned.
+        # Skills nobody needs any more keep an empty column.
+        vocab = dict(self.vocab)
+        pos = {t: i for i, t in enumerate(self.titles)}
+        ptr, idx = self.matrix.indptr, self.matrix.indices
+        rows = []
+        for t in titles:
+            if t in changed:
+                rows.append(sorted({vocab.setdefault(s, len(vocab)) for s in changed[t]}))
+            else:
+                i = pos[t]
+                rows.append(idx[ptr[i]:ptr[i + 1]])
+        out = SkillMatrix.__new__(SkillMatrix)
+        out._assemble(titles, vocab, rows)
+        return out
+
+    def careers_with(self, skill_id: int) -> np.ndarray:
+        # skill → careers inverted index (the matrix in CSC form, built on first use)
+        if self._by_skill is None:
+            self._by_skill = self.matrix.tocsc()
+        by = self._by_skill
+        return by.indices[by.indptr[skill_id]:by.indptr[skill_id + 1]]
+
+    def encode(self, items: List[str]) -> np.ndarray:
+        vec = np.zeros(len(self.vocab))
+        ids = [self.vocab[s] for s in items if s in self.vocab]
+        vec[ids] = 1.0
+        return vec
+
+    def score(self, skills: List[str], interests: List[str]) -> np.ndarray:
+        # Skill and interest overlap for every career in one sparse product
+        profile = np.column_stack([self.encode(skills), self.encode(interests)])
+        hits = self.matrix @ profile
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.where(self.row_len[:, None] > 0, hits / self.row_len[:, None], 0.0)
+        return SKILL_WEIGHT * frac[:, 0] + INTEREST_WEIGHT * (frac[:, 1] * INTEREST_DAMPING)
+
+    def encode_many(self, lists: List[List[str]]) -> sparse.csr_matrix:
+        indptr, indices = [0], []
+        for items in lists:
+            indices.extend({self.vocab[s] for s in items if s in self.vocab})
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.ones(len(indices)), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(lists), len(self.vocab)),
+        )
+
+    def _fraction(self, hits) -> sparse.csc_matrix:
+        hits = sparse.csc_matrix(hits)
+        hits.data = hits.data / self.row_len[hits.indices]
+        return hits
+
+    def score_many(self, skills_lists: List[List[str]], interests_lists: List[List[str]]) -> sparse.csc_matrix:
+        # (careers x profiles) scores for a whole batch; only careers sharing a
+        # skill with a profile get an entry, so the result stays sparse.
+        skills = self._fraction(self.matrix @ self.encode_many(skills_lists).T)
+        interests = self._fraction(self.matrix @ self.encode_many(interests_lists).T)
+        return sparse.csc_matrix(SKILL_WEIGHT * skills + INTEREST_WEIGHT * (interests * INTEREST_DAMPING))
+
+    def score_rows(self, skills: List[str], interests: List[str], rows: np.ndarray) -> np.ndarray:
+        # score() restricted to some careers; identical values for those rows
+        profile = np.column_stack([self.encode(skills), self.encode(interests)])
+        frac = (self.matrix[rows] @ profile) / self.row_len[rows][:, None]
+        return SKILL_WEIGHT * frac[:, 0] + INTEREST_WEIGHT * (frac[:, 1] * INTEREST_DAMPING)
+
+    def skill_gains(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        # What-if for every skill at once. Adding a skill raises the score of
+        # each career listing it by SKILL_WEIGHT / row_len, whatever else the
+        # profile holds, so one product of the transposed incidence rows gives
+        # the summed gain over `rows` (default: every career) for the whole
+        # vocabulary. The catalog-wide vector doesn't depend on the profile
+        # and is computed once.
+        if rows is not None:
+            return self.matrix[rows].T @ (SKILL_WEIGHT / self.row_len[rows])
+        if self._gains is None:
+            with np.errstate(divide="ignore"):
+                step = np.where(self.row_len > 0, SKILL_WEIGHT / self.row_len, 0.0)
+            self._gains = self.matrix.T @ step
+        return self._gains.copy()
+
+    def skill_reach(self) -> np.ndarray:
+        # Careers listing each skill (column counts), computed once
+        if self._reach is None:
+            self._reach = np.bincount(self.matrix.indices, minlength=len(self.vocab))
+        return self._reach
+
+    def top(self, scores: np.ndarray, k: int = 10) -> List[Tuple[int, float]]:
+        return top_k(np.arange(len(scores)), scores, k)
+
+    def top_many(self, scores: sparse.csc_matrix, k: int = 10) -> List[List[Tuple[int, float]]]:
+        out = []
+        for j in range(scores.shape[1]):
+            lo, hi = scores.indptr[j], scores.indptr[j + 1]
+            out.append(top_k(scores.indices[lo:hi], scores.data[lo:hi], k))
+        return out
+
+# -----------------------------
+# Incremental scoring
+# -----------------------------
+class IncrementalScorer:
+    # One profile's skill/interest overlap counts per career, kept between
+    # edits. Adding or removing a term touches only the careers listing it
+    # (via SkillMatrix.careers_with), and the top k is patched rather than
+    # recomputed: an added term can only lift the careers it touches, so the
+    # new top k lies within the old top k plus those careers. A removal only
+    # forces a rescan if it lowers a career that is currently in the top k.
+    # Scores are bit-for-bit those of SkillMatrix.score
+    # (benchmarks/check_incremental.py checks this over random edits).
+    def __init__(self, skills: SkillMatrix, k: int = 10):
+        self.skills = skills
+        self.k = k
+        self.hits = np.zeros((2, len(skills.titles)), dtype=np.uint16)
+        self.terms: Tuple[Set[int], Set[int]] = (set(), set())
+        self._top: Optional[List[Tuple[int, float]]] = []
+
+    def _scores(self, rows: np.ndarray) -> np.ndarray:
+        frac = self.hits[:, rows] / self.skills.row_len[rows]
+        return SKILL_WEIGHT * frac[0] + INTEREST_WEIGHT * (frac[1] * INTEREST_DAMPING)
+
+    def update(self, skills: List[str], interests: List[str]):
+        # Move to a new (normalized) profile by applying only the differences
+        vocab = self.skills.vocab
+        for kind, items in enumerate((skills, interests)):
+            want = {vocab[s] for s in items if s in vocab}
+            for term in want - self.terms[kind]:
+                self._apply(kind, term, 1)
+            for term in self.terms[kind] - want:
+                self._apply(kind, term, -1)
+
+    def _apply(self, kind: int, term: int, delta: int):
+        rows = self.skills.careers_with(term)
+        if delta > 0:
+            self.hits[kind, rows] += 1
+            self.terms[kind].add(term)
+        else:
+            self.hits[kind, rows] -= 1
+            self.terms[kind].discard(term)
+        if self._top is None:
+            return
+        top_ids = np.fromiter((i for i, _ in self._top), dtype=rows.dtype, count=len(self._top))
+        if delta > 0:
+            cand = np.union1d(top_ids, rows)
+            self._top = top_k(cand, self._scores(cand), self.k)
+        elif np.isin(top_ids, rows, assume_unique=True).any():
+            self._top = None
+
+    def top(self) -> List[Tuple[int, float]]:
+        if self._top is None:
+            rows = np.flatnonzero(self.hits.any(axis=0))
+            self._top = top_k(rows, self._scores(rows), self.k)
+        return self._top
+
+def top_k(ids: np.ndarray, scores: np.ndarray, k: int = 10) -> List[Tuple[int, float]]:
+    # Partial sort: only careers that can reach the top k get fully ranked.
+    # Ties on the rounded match keep catalog order, like a stable sort.
+    keep = scores > 0
+    ids, scores = ids[keep], scores[keep]
+    if len(scores) > k:
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        keep = scores >= kth - _TIE_SLACK
+        ids, scores = ids[keep], scores[keep]
+    ranked = sorted((-round(float(s) * 100, 1), int(i)) for i, s in zip(ids, scores))
+    return [(i, -m) for m, i in ranked[:k]]
@@ -0,0 +1,76 @@
+"""Career filters as precomputed bitmaps over the catalog rows.
+
+One packed bitmap (np.packbits, a bit per career in catalog row order) per
+facet value: salary bands ("pays up to at least X LPA"), skill domains
+(see skills.DOMAINS) and, built on first use, each required skill. A
+filter is the AND of its facets (OR within the chosen domains), and only
+the careers left are scored, so a narrow filter makes scoring cheaper.
+"""
+from functools import reduce
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from catalog import Catalog
+from engine import SkillMatrix
+from skills import DOMAINS
+
+# Minimum-salary choices (LPA) with a prebuilt bitmap; others are computed
+SALARY_BANDS = (4.0, 6.0, 8.0, 10.0, 12.0, 15.0, 20.0)
+
+def _pack(mask: np.ndarray) -> np.ndarray:
+    return np.packbits(mask)
+
+class Facets:
+    def __init__(self, catalog: Catalog, skills: SkillMatrix, domains: Dict[str, List[str]] = DOMAINS):
+        self.n = len(catalog)
+        self.skills = skills
+        # Upper end of each career's salary range; NaN (no number) never passes
+        _, self.salary_max = catalog.salary()
+        with np.errstate(invalid="ignore"):
+            self.salary = {band: _pack(self.salary_max >= band) for band in SALARY_BANDS}
+
+        # A career is in the domain(s) holding most of its skills
+        pairs = [(skills.vocab[s], d) for d, names in enumerate(domains.values()) for s in names if s in skills.vocab]
+        incidence = sparse.csr_matrix(
+            (np.ones(len(pairs)), ([j for j, _ in pairs], [d for _, d in pairs])),
+            shape=(len(skills.vocab), len(domains)),
+        )
+        counts = (skills.matrix @ incidence).toarray()
+        member = (counts == counts.max(axis=1, keepdims=True)) & (counts > 0)
+        self.domains = {name: _pack(member[:, d]) for d, name in enumerate(domains)}
+        self.domain_sizes = {name: int(member[:, d].sum()) for d, name in enumerate(domains)}
+        self._required: Dict[str, np.ndarray] = {}
+        self._none = np.zeros((self.n + 7) // 8, dtype=np.uint8)
+
+    def required(self, skill: str) -> np.ndarray:
+        # Careers listing this (normalized) skill, from the inverted index
+        bits = self._required.get(skill)
+        if bits is None:
+            j = self.skills.vocab.get(skill)
+            if j is None:
+                bits = self._none
+            else:
+                mask = np.zeros(self.n, dtype=bool)
+                mask[self.skills.careers_with(j)] = True
+                bits = _pack(mask)
+            self._required[skill] = bits
+        return bits
+
+    def select(self, min_salary: Optional[float] = None, domains: Optional[Sequence[str]] = None,
+               required: Optional[Sequence[str]] = None) -> Optional[np.ndarray]:
+        # Catalog rows passing every given filter, or None when none is set
+        parts = []
+        if min_salary:
+            bits = self.salary.get(float(min_salary))
+            if bits is None:
+                with np.errstate(invalid="ignore"):
+                    bits = _pack(self.salary_max >= min_salary)
+            parts.append(bits)
+        if domains:
+            parts.append(reduce(np.bitwise_or, (self.domains.get(d, self._none) for d in domains)))
+        parts.extend(self.required(s) for s in required or ())
+        if not parts:
+            return None
+        return np.flatnonzero(np.unpackbits(reduce(np.bitwise_and, parts), count=self.n))
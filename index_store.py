@@ -0,0 +1,196 @@
+"""Prebuilt indexes on disk, memory-mapped read-only at startup.
+
+    python index_store.py build advisor_index     # fit once, offline
+    ADVISOR_INDEX=advisor_index streamlit run app.py
+
+An index directory holds the career x skill incidence matrix and the Q&A
+TF-IDF index (term counts, IDF weights, document vectors, postings and a
+digest per document) as raw .npy arrays, plus strings.json (titles,
+vocabularies, Q&A labels) and manifest.json. Workers open the arrays with mmap_mode="r", so every
+process on a host shares the same physical pages and none of them refits.
+
+The manifest records the format version, the KB version the index was
+built from (a content hash, so the index stays valid when the KB file is
+copied, moved or touched), the tokenizer it used and a SHA-256 per file. load() returns
+None when any of them doesn't match (or a file is missing or damaged);
+advisor.py then builds the indexes in memory as usual.
+
+    python index_store.py check advisor_index     # exit 1 if stale
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from importlib import metadata
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from engine import SkillMatrix
+from qa import QAIndex
+
+log = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+MANIFEST = "manifest.json"
+STRINGS = "strings.json"
+
+def tokenizer_version() -> str:
+    # Q&A term ids depend on sklearn's analyzer (stop word list), so an index
+    # built under another scikit-learn release is treated as stale
+    try:
+        return "scikit-learn " + metadata.version("scikit-learn")
+    except metadata.PackageNotFoundError:
+        return "scikit-learn ?"
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _ordered(vocab: Dict[str, int]) -> List[str]:
+    return sorted(vocab, key=vocab.__getitem__)
+
+def _csr(prefix: str, m: sparse.csr_matrix) -> Dict[str, np.ndarray]:
+    # Saved with the dtypes scipy already chose, so loading wraps them as is
+    return {f"{prefix}_data": m.data, f"{prefix}_indices": m.indices, f"{prefix}_indptr": m.indptr}
+
+# -----------------------------
+# Build
+# -----------------------------
+def save(path: str, kb_version: str, skills: SkillMatrix, qa: QAIndex):
+    arrays = {
+        **_csr("skills", skills.matrix),
+        **_csr("qa_counts", qa.counts),
+        **_csr("qa_doc_vec", qa.doc_vec),
+        **_csr("qa_postings", qa.postings),
+        "qa_idf": qa.idf,
+        "qa_max_weight": qa.max_weight,
+        "qa_doc_hash": qa.doc_hash,
+    }
+    strings = {
+        "titles": skills.titles,
+        "skill_vocab": _ordered(skills.vocab),
+        "qa_vocab": _ordered(qa.vocab),
+        "qa_labels": qa.labels,
+    }
+    # Written next to the target and swapped in with renames; processes
+    # still mapping the old files keep reading them until they restart
+    path = os.path.abspath(path)
+    tmp, old = f"{path}.tmp-{os.getpid()}", f"{path}.old-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    files = {}
+    for name, arr in arrays.items():
+        fname = f"{name}.npy"
+        np.save(os.path.join(tmp, fname), np.ascontiguousarray(arr), allow_pickle=False)
+        files[fname] = _sha256(os.path.join(tmp, fname))
+    with open(os.path.join(tmp, STRINGS), "w", encoding="utf-8") as f:
+        json.dump(strings, f, ensure_ascii=False)
+    files[STRINGS] = _sha256(os.path.join(tmp, STRINGS))
+    manifest = {
+        "format": FORMAT_VERSION,
+        "kb_version": kb_version,
+        "tokenizer": tokenizer_version(),
+        "careers": len(skills.titles),
+        "qa_docs": len(qa.labels),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "files": files,
+    }
+    with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    if os.path.exists(path):
+        os.rename(path, old)
+    os.rename(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+# -----------------------------
+# Load
+# -----------------------------
+def stale_reason(path: str, kb_version: str, verify: bool = True) -> Optional[str]:
+    # Why the index at `path` can't serve this KB, or None if it can
+    try:
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as exc:
+        return f"no readable manifest ({exc})"
+    if manifest.get("format") != FORMAT_VERSION:
+        return f"format {manifest.get('format')} != {FORMAT_VERSION}"
+    if manifest.get("kb_version") != kb_version:
+        return f"built for KB {manifest.get('kb_version')}, serving {kb_version}"
+    if manifest.get("tokenizer") != tokenizer_version():
+        return f"built with {manifest.get('tokenizer')}, running {tokenizer_version()}"
+    for fname, digest in (manifest.get("files") or {}).items():
+        full = os.path.join(path, fname)
+        if not os.path.isfile(full):
+            return f"{fname} is missing"
+        if verify and _sha256(full) != digest:
+            return f"{fname} checksum mismatch"
+    return None
+
+def load(path: str, kb_version: str, verify: bool = True) -> Optional[Tuple[SkillMatrix, QAIndex]]:
+    # Memory-mapped indexes for this KB version, or None (logged) if stale.
+    # verify=False skips hashing the files, for very large indexes whose
+    # directory is known to be intact.
+    reason = stale_reason(path, kb_version, verify)
+    if reason is not None:
+        log.warning("Ignoring prebuilt index %s: %s; building in memory", path, reason)
+        return None
+    try:
+        with open(os.path.join(path, STRINGS), encoding="utf-8") as f:
+            strings = json.load(f)
+
+        def arr(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+
+        def csr(prefix: str, shape: Tuple[int, int]) -> sparse.csr_matrix:
+            return sparse.csr_matrix((arr(f"{prefix}_data"), arr(f"{prefix}_indices"), arr(f"{prefix}_indptr")),
+                                     shape=shape, copy=False)
+
+        skill_vocab = {s: i for i, s in enumerate(strings["skill_vocab"])}
+        skills = SkillMatrix.from_arrays(strings["titles"], skill_vocab, arr("skills_data"),
+                                         arr("skills_indices"), arr("skills_indptr"))
+        qa_vocab = {t: i for i, t in enumerate(strings["qa_vocab"])}
+        docs = (len(strings["qa_labels"]), len(qa_vocab))
+        qa = QAIndex.from_arrays(
+            arr("qa_doc_hash"), strings["qa_labels"], qa_vocab, csr("qa_counts", docs), arr("qa_idf"),
+            csr("qa_doc_vec", docs), csr("qa_postings", docs[::-1]), arr("qa_max_weight"), kb_version,
+        )
+    except (OSError, ValueError, KeyError) as exc:
+        log.warning("Ignoring prebuilt index %s: %s; building in memory", path, exc)
+        return None
+    log.info("Mapped prebuilt index %s (%d careers, %d Q&A docs)", path, len(skills.titles), len(qa.labels))
+    return skills, qa
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None):
+    import argparse
+    p = argparse.ArgumentParser(description="Build or check the prebuilt advisor indexes.")
+    p.add_argument("command", choices=["build", "check"])
+    p.add_argument("path", nargs="?", default=os.environ.get("ADVISOR_INDEX", "advisor_index"),
+                   help="Index directory (default $ADVISOR_INDEX or ./advisor_index)")
+    args = p.parse_args(argv)
+    # Fit from the KB itself (ADVISOR_KB), never from an existing index
+    os.environ.pop("ADVISOR_INDEX", None)
+    os.environ["ADVISOR_QA_STARTUP"] = "lazy"
+    import advisor
+    if args.command == "check":
+        idx = advisor.current_indexes()
+        reason = stale_reason(args.path, idx.kb.version)
+        print(f"{args.path}: {reason or 'up to date'} (KB {idx.kb.version})")
+        raise SystemExit(1 if reason else 0)
+    t0 = time.perf_counter()
+    idx = advisor.qa_indexes()
+    save(args.path, idx.kb.version, idx.skills, idx.qa)
+    print(f"Wrote {args.path} for KB {idx.kb.version}: {len(idx.skills.titles)} careers, "
+          f"{len(idx.qa.labels)} Q&A docs ({time.perf_counter() - t0:.2f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""Knowledge base sources: the built-in dicts, or a JSON, Parquet or SQLite file.
+
+Titles and skills are read eagerly because scoring needs all of them. The
+description, roadmap and salary of a career are only fetched from the
+source the first time something asks for them. File sources are stat-ed
+on access (throttled) and reloaded when their mtime or size changes;
+reload listeners get the old and new snapshot so derived indexes can be
+patched instead of rebuilt.
+
+    python kb.py export careers.sqlite   # write the built-in KB to a file
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+DETAIL_FIELDS = ("description", "roadmap", "salary")
+FIELDS = ("skills",) + DETAIL_FIELDS
+
+def kb_fingerprint(careers: Dict[str, Dict]) -> str:
+    # Content hash of the knowledge base; changes whenever any career changes
+    blob = json.dumps(careers, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+def _pyarrow():
+    # Only Parquet KBs need pyarrow, so it is imported on first use
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Parquet knowledge bases need pyarrow: pip install pyarrow") from exc
+    return pa, pq
+
+# -----------------------------
+# Sources
+# -----------------------------
+class BuiltinSource:
+    def __init__(self, careers: Dict[str, Dict], courses: Dict[str, List[str]]):
+        self.careers, self.courses = careers, courses
+
+    def stamp(self):
+        return None
+
+    def version(self) -> str:
+        return kb_fingerprint(self.careers)
+
+    def read_index(self) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        return {t: info["skills"] for t, info in self.careers.items()}, self.courses
+
+    def read_details(self, titles: Optional[List[str]] = None) -> Dict[str, Dict]:
+        titles = self.careers if titles is None else titles
+        return {t: {f: self.careers[t][f] for f in DETAIL_FIELDS} for t in titles if t in self.careers}
+
+class _FileSource:
+    def __init__(self, path: str):
+        self.path = path
+
+    def stamp(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def version(self) -> str:
+        # Hash of the file's bytes: the same KB copied to another host or
+        # path (or just touched) keeps its version, and prebuilt indexes
+        # built for it stay valid
+        h = hashlib.sha256()
+        with open(self.path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        return h.hexdigest()[:16]
+
+class JsonSource(_FileSource):
+    # {"careers": {title: {skills, description, roadmap, salary}}, "courses": {skill: [..]}}
+    # JSON has to be parsed whole, so details are kept from the index read.
+    def read_index(self):
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        careers = data.get("careers", {})
+        self._details = {t: {f: info.get(f, "" if f != "roadmap" else []) for f in DETAIL_FIELDS} for t, info in careers.items()}
+        return {t: info.get("skills", []) for t, info in careers.items()}, data.get("courses", {})
+
+    def read_details(self, titles=None):
+        if titles is None:
+            return dict(self._details)
+        return {t: self._details[t] for t in titles if t in self._details}
+
+class ParquetSource(_FileSource):
+    # One row per career (title, skills, description, roadmap, salary);
+    # SKILL_COURSES lives in the schema metadata under b"skill_courses".
+    def read_index(self):
+        _, pq = _pyarrow()
+        table = pq.read_table(self.path, columns=["title", "skills"])
+        meta = table.schema.metadata or {}
+        courses = json.loads(meta.get(b"skill_courses", b"{}"))
+        cols = table.to_pydict()
+        return dict(zip(cols["title"], (s or [] for s in cols["skills"]))), courses
+
+    def read_details(self, titles=None):
+        _, pq = _pyarrow()
+        filters = [("title", "in", list(titles))] if titles is not None else None
+        cols = pq.read_table(self.path, columns=["title"] + list(DETAIL_FIELDS), filters=filters).to_pydict()
+        return {
+            t: {"description": d or "", "roadmap": r or [], "salary": s or ""}
+            for t, d, r, s in zip(cols["title"], cols["description"], cols["roadmap"], cols["salary"])
+        }
+
+class SqliteSource(_FileSource):
+    # careers(title PRIMARY KEY, skills JSON, description, roadmap JSON, salary)
+    # courses(skill PRIMARY KEY, courses JSON)
+    def _connect(self):
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+
+    def read_index(self):
+        with self._connect() as db:
+            careers = {t: json.loads(s) for t, s in db.execute("SELECT title, skills FROM careers ORDER BY rowid")}
+            courses = {k: json.loads(v) for k, v in db.execute("SELECT skill, courses FROM courses")}
+        return careers, courses
+
+    def read_details(self, titles=None):
+        sql = "SELECT title, description, roadmap, salary FROM careers"
+        out = {}
+        with self._connect() as db:
+            if titles is None:
+                rows = db.execute(sql)
+            else:
+                titles = list(titles)
+                rows = []
+                for i in range(0, len(titles), 500):
+                    chunk = titles[i:i + 500]
+                    rows.extend(db.execute(f"{sql} WHERE title IN ({','.join('?' * len(chunk))})", chunk))
+            for t, d, r, s in rows:
+                out[t] = {"description": d, "roadmap": json.loads(r), "salary": s}
+        return out
+
+# What a bad or half-written KB file raises on read (pyarrow's ArrowInvalid
+# is a ValueError, its IO errors are OSErrors)
+LOAD_ERRORS = (OSError, ValueError, KeyError, TypeError, AttributeError, sqlite3.Error)
+
+SOURCES = {".json": JsonSource, ".parquet": ParquetSource, ".sqlite": SqliteSource, ".db": SqliteSource}
+
+def open_source(path: str):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SOURCES:
+        raise ValueError(f"Unsupported knowledge base file: {path} (use .json, .parquet or .sqlite)")
+    return SOURCES[ext](path)
+
+# -----------------------------
+# Catalog
+# -----------------------------
+class _Details:
+    # Per-snapshot cache of career text, filled on first use
+    def __init__(self, source, titles: List[str]):
+        self.source = source
+        self.titles = titles
+        self.by_title: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        # Sources that can't fetch single rows cheaply are read in one go
+        self.bulk = not isinstance(source, (SqliteSource, ParquetSource))
+
+    def get(self, title: str) -> Dict:
+        d = self.by_title.get(title)
+        if d is None:
+            self.prefetch([title])
+            d = self.by_title[title]
+        return d
+
+    def prefetch(self, titles):
+        # One source read for every title not cached yet
+        missing = [t for t in titles if t not in self.by_title]
+        if missing:
+            with self.lock:
+                missing = [t for t in missing if t not in self.by_title]
+                if missing:
+                    bulk = self.bulk or len(missing) > 1000
+                    self.by_title.update(self.source.read_details(None if bulk else missing))
+                    # Deleted or renamed in the file since this snapshot was
+                    # read: blank details until the next refresh replaces it
+                    for t in missing:
+                        if t not in self.by_title:
+                            self.by_title[t] = {"description": "", "roadmap": [], "salary": ""}
+
+class Career(Mapping):
+    # Dict-like career record; detail fields are resolved lazily
+    __slots__ = ("title", "skills", "_details")
+
+    def __init__(self, title: str, skills: List[str], details: _Details):
+        self.title, self.skills, self._details = title, skills, details
+
+    def __getitem__(self, key):
+        if key == "skills":
+            return self.skills
+        if key in DETAIL_FIELDS:
+            return self._details.get(self.title)[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return f"Career({self.title!r}, skills={self.skills!r})"
+
+class Snapshot(NamedTuple):
+    version: str
+    careers: Dict[str, Career]
+    courses: Dict[str, List[str]]
+    details: _Details
+
+class _Live(Mapping):
+    # Mapping that always reads through to the knowledge base's current snapshot
+    def __init__(self, get: Callable[[], Mapping]):
+        self._get = get
+
+    def __getitem__(self, key):
+        return self._get()[key]
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self):
+        return len(self._get())
+
+    def __contains__(self, key):
+        return key in self._get()
+
+class KnowledgeBase:
+    def __init__(self, source, check_interval: float = 1.0):
+        self.source = source
+        self.check_interval = check_interval
+        self._listeners: List[Callable[[Snapshot, Snapshot], None]] = []
+        self._lock = threading.Lock()
+        self._checked = time.monotonic()
+        self._stamp = source.stamp()
+        self.snapshot = self._load()
+        self.careers: Mapping = _Live(lambda: self.snapshot.careers)
+        self.courses: Mapping = _Live(lambda: self.snapshot.courses)
+
+    @property
+    def version(self) -> str:
+        return self.snapshot.version
+
+    def _load(self) -> Snapshot:
+        skills, courses = self.source.read_index()
+        details = _Details(self.source, list(skills))
+        careers = {t: Career(t, list(s), details) for t, s in skills.items()}
+        return Snapshot(self.source.version(), careers, dict(courses), details)
+
+    def on_reload(self, fn: Callable[[Snapshot, Snapshot], None]):
+        self._listeners.append(fn)
+        return fn
+
+    def use(self, source):
+        # Switch to another source; listeners see it as a reload
+        with self._lock:
+            self.source = source
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False) -> bool:
+        # Cheap enough to call on every request: at most one stat per interval
+        now = time.monotonic()
+        if not force and now - self._checked < self.check_interval:
+            return False
+        with self._lock:
+            self._checked = now
+            try:
+                stamp = self.source.stamp()
+            except OSError:
+                log.warning("Knowledge base %s is unavailable; keeping the loaded copy", getattr(self.source, "path", "?"))
+                return False
+            if stamp == self._stamp and not force:
+                return False
+            try:
+                new = self._load()
+            except LOAD_ERRORS as exc:
+                # Half-written or invalid file: keep serving the loaded copy,
+                # and don't parse this version again until it changes
+                self._stamp = stamp
+                log.warning("Knowledge base %s could not be read (%s); keeping the loaded copy",
+                            getattr(self.source, "path", "?"), exc)
+                return False
+            old = self.snapshot
+            for fn in self._listeners:
+                fn(old, new)
+            self._stamp, self.snapshot = stamp, new
+        log.info("Reloaded knowledge base %s (%d careers, version %s)", getattr(self.source, "path", "built-in"), len(new.careers), new.version)
+        return True
+
+# -----------------------------
+# Export
+# -----------------------------
+def export_kb(path: str, careers: Mapping, courses: Mapping):
+    ext = os.path.splitext(path)[1].lower()
+    rows = [{"title": t, **{f: info[f] for f in FIELDS}} for t, info in careers.items()]
+    if ext == ".json":
+        data = {"careers": {r.pop("title"): r for r in rows}, "courses": dict(courses)}
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+    elif ext == ".parquet":
+        pa, pq = _pyarrow()
+        table = pa.Table.from_pylist(rows).replace_schema_metadata({"skill_courses": json.dumps(dict(courses), ensure_ascii=False)})
+        tmp = path + ".tmp"
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+    elif ext in (".sqlite", ".db"):
+        tmp = path + ".tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        with sqlite3.connect(tmp) as db:
+            db.execute("CREATE TABLE careers (title TEXT PRIMARY KEY, skills TEXT, description TEXT, roadmap TEXT, salary TEXT)")
+            db.execute("CREATE TABLE courses (skill TEXT PRIMARY KEY, courses TEXT)")
+            db.executemany("INSERT INTO careers VALUES (?, ?, ?, ?, ?)", [
+                (r["title"], json.dumps(r["skills"], ensure_ascii=False), r["description"],
+                 json.dumps(r["roadmap"], ensure_ascii=False), r["salary"]) for r in rows])
+            db.executemany("INSERT INTO courses VALUES (?, ?)", [(k, json.dumps(v, ensure_ascii=False)) for k, v in courses.items()])
+        db.close()
+        os.replace(tmp, path)
+    else:
+        raise ValueError(f"Unsupported knowledge base file: {path} (use .json, .parquet or .sqlite)")
+
+if __name__ == "__main__":
+    import argparse
+    p = argparse.ArgumentParser(description="Knowledge base utilities.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    ex = sub.add_parser("export", help="Write the built-in careers and courses to a JSON/Parquet/SQLite file")
+    ex.add_argument("path")
+    args = p.parse_args()
+    from advisor import BUILTIN_CAREERS, BUILTIN_COURSES
+    export_kb(args.path, BUILTIN_CAREERS, BUILTIN_COURSES)
+    print(f"Wrote {len(BUILTIN_CAREERS)} careers to {args.path}")
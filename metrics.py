@@ -0,0 +1,250 @@
+"""In-process stage timers, counters and latency histograms.
+
+    from metrics import METRICS
+    with METRICS.stage("recommend_careers"): ...
+    @METRICS.timed("qa_answer")
+    def qa_answer(...): ...
+
+Histograms use fixed buckets, so recording is a bisect and two adds.
+METRICS.prometheus() renders everything in the Prometheus text format.
+Exporting is configured from the environment:
+
+    ADVISOR_METRICS=0               turn timers and counters into no-ops
+    ADVISOR_METRICS_FILE=path.prom  rewrite this file every ADVISOR_METRICS_INTERVAL
+                                    seconds (default 15; node_exporter textfile style)
+    ADVISOR_METRICS_PORT=9100       serve GET /metrics from a background thread
+
+Exporters are started by the entry points (app.py, server.py), not on
+import, and each process gets its own: the file name carries the pid
+(path.<pid>.prom, or wherever "{pid}" appears in it), and a process whose
+port is taken tries the next ADVISOR_METRICS_PORTS - 1 (default 16 in all)
+before giving up with a warning.
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# Upper bounds in seconds, 100 µs .. 10 s
+BUCKETS: Tuple[float, ...] = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                              0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        # Bucket upper bound holding the q-th observation (coarse, for display)
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank and n:
+                return bound
+        return 0.0
+
+class _Stage:
+    __slots__ = ("metrics", "name", "t0")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics, self.name = metrics, name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_STAGE = _NoStage()
+
+class Metrics:
+    def __init__(self, prefix: str = "advisor", enabled: bool = True):
+        self.prefix, self.enabled = prefix, enabled
+        self.stages: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+        # name → (help, kind, label, callback returning {label value: number}),
+        # read at export time
+        self._collectors: Dict[str, Tuple[str, str, str, Callable[[], Dict[str, float]]]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.started = time.time()
+
+    # --- recording ---
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            h = self.stages.get(stage)
+            if h is None:
+                h = self.stages[stage] = Histogram()
+            h.observe(seconds)
+        rerun = getattr(self._local, "rerun", None)
+        if rerun is not None:
+            rerun.append((stage, seconds))
+
+    def stage(self, name: str):
+        return _Stage(self, name) if self.enabled else _NO_STAGE
+
+    def timed(self, name: str):
+        def deco(fn):
+            if not self.enabled:
+                return fn
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - t0)
+            return wrapper
+        return deco
+
+    def inc(self, name: str, n: float = 1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def collector(self, name: str, help: str, kind: str, label: str, fn: Callable[[], Dict[str, float]]):
+        # For values owned elsewhere (cache stats); kind is "counter" or "gauge"
+        self._collectors[name] = (help, kind, label, fn)
+
+    # --- per-rerun breakdown (one script run = one thread) ---
+    def begin_rerun(self):
+        self._local.rerun = []
+
+    def rerun_breakdown(self) -> List[Tuple[str, float]]:
+        # Stages recorded on this thread since begin_rerun(), summed per stage
+        totals: Dict[str, float] = {}
+        for stage, seconds in getattr(self._local, "rerun", None) or []:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        return list(totals.items())
+
+    # --- export ---
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                name: {"count": h.count, "mean_ms": h.sum / h.count * 1e3 if h.count else 0.0,
+                       "p50_ms": h.quantile(0.5) * 1e3, "p95_ms": h.quantile(0.95) * 1e3}
+                for name, h in self.stages.items()
+            }
+
+    def prometheus(self) -> str:
+        p = self.prefix
+        out = [f"# HELP {p}_stage_seconds Time spent per app stage",
+               f"# TYPE {p}_stage_seconds histogram"]
+        with self._lock:
+            stages = {k: (list(h.counts), h.sum, h.count) for k, h in self.stages.items()}
+            counters = dict(self.counters)
+        for name, (counts, total, count) in sorted(stages.items()):
+            cum = 0
+            for bound, n in zip(BUCKETS, counts):
+                cum += n
+                out.append(f'{p}_stage_seconds_bucket{{stage="{name}",le="{bound:g}"}} {cum}')
+            out.append(f'{p}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {count}')
+            out.append(f'{p}_stage_seconds_sum{{stage="{name}"}} {total:.9f}')
+            out.append(f'{p}_stage_seconds_count{{stage="{name}"}} {count}')
+        for name, value in sorted(counters.items()):
+            out += [f"# TYPE {p}_{name}_total counter", f"{p}_{name}_total {value:g}"]
+        for name, (help, kind, label, fn) in sorted(self._collectors.items()):
+            out += [f"# HELP {p}_{name} {help}", f"# TYPE {p}_{name} {kind}"]
+            for key, value in fn().items():
+                out.append(f'{p}_{name}{{{label}="{key}"}} {value:g}')
+        out.append(f"{p}_uptime_seconds {time.time() - self.started:.3f}")
+        return "\n".join(out) + "\n"
+
+    def dump(self, path: str):
+        # Write-then-rename so scrapers never read a half-written file
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+    def start_dumping(self, path: str, interval: float) -> threading.Thread:
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.dump(path)
+                except OSError:
+                    pass
+        t = threading.Thread(target=loop, name="metrics-dump", daemon=True)
+        t.start()
+        return t
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                found = self.path.split("?", 1)[0] == "/metrics"
+                body = metrics.prometheus().encode("utf-8") if found else b""
+                self.send_response(200 if found else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+METRICS = Metrics(enabled=os.environ.get("ADVISOR_METRICS", "1") != "0")
+
+_exporters_started = False
+
+def _per_process(path: str) -> str:
+    pid = str(os.getpid())
+    if "{pid}" in path:
+        return path.replace("{pid}", pid)
+    root, ext = os.path.splitext(path)
+    return f"{root}.{pid}{ext}"
+
+def start_exporters(metrics: Optional[Metrics] = None):
+    # Once per process, from the ADVISOR_METRICS_* environment variables
+    global _exporters_started
+    if _exporters_started:
+        return
+    _exporters_started = True
+    metrics = metrics or METRICS
+    path = os.environ.get("ADVISOR_METRICS_FILE")
+    if path:
+        metrics.start_dumping(_per_process(path), float(os.environ.get("ADVISOR_METRICS_INTERVAL", 15)))
+    port = os.environ.get("ADVISOR_METRICS_PORT")
+    if port:
+        first, tries = int(port), int(os.environ.get("ADVISOR_METRICS_PORTS", 16))
+        for p in range(first, first + max(tries, 1)):
+            try:
+                metrics.serve(p)
+            except OSError:
+                continue
+            log.info("Serving metrics on port %d", p)
+            break
+        else:
+            log.warning("No free metrics port in %d-%d; metrics are not served by this process",
+                        first, first + max(tries, 1) - 1)
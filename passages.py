@@ -0,0 +1,161 @@
+"""Passage-level BM25 retrieval over the knowledge base.
+
+Every description, roadmap step, listed skill and course hint is its own
+passage, tagged with its kind and parent (the career, or the skill for a
+course). Many passages share their text ("Python" is listed by hundreds
+of careers, "Apply for QA roles" recurs), so each distinct text is
+tokenized and stored once and carries the list of passages that use it.
+BM25 statistics (N, document frequencies, average length) still count
+every passage, so scores are those of the un-deduplicated collection.
+
+Weights live in a term x text CSR matrix (postings, float32). A query
+only walks the postings of its terms; common terms are first scored on
+the candidates of the rarer ones and skipped entirely when their summed
+maximum weight can't lift another text into the top k (max-score bound),
+so query time tracks the rare terms' postings rather than the corpus.
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from qa import _count_terms, _top_k, analyzer
+
+K1 = 1.2
+B = 0.75
+KINDS = ("description", "roadmap", "skill", "course")
+
+class Passage(NamedTuple):
+    kind: int      # index into KINDS
+    parent: int    # index into the index's parents (career titles, then skills)
+    text: str
+
+class PassageIndex:
+    def __init__(self, passages: Sequence[Passage], parents: List[str], kb_hash: str = "",
+                 previous: Optional["PassageIndex"] = None):
+        self.parents, self.kb_hash = parents, kb_hash
+        row: Dict[str, int] = {}
+        text_of = np.fromiter((row.setdefault(p.text, len(row)) for p in passages), dtype=np.int64,
+                              count=len(passages))
+        self.texts = list(row)
+        self.row = row
+        self.vocab, self.counts = self._tokenize(previous)
+
+        # Passages per text, grouped in CSR form (text order, then passage order)
+        order = np.argsort(text_of, kind="stable")
+        self.owner_ptr = np.zeros(len(self.texts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(text_of, minlength=len(self.texts)), out=self.owner_ptr[1:])
+        self.owner_kind = np.fromiter((p.kind for p in passages), dtype=np.uint8, count=len(passages))[order]
+        self.owner_parent = np.fromiter((p.parent for p in passages), dtype=np.int32, count=len(passages))[order]
+
+        # BM25 over passages: a text used m times counts m times in N, df and avgdl
+        mult = np.diff(self.owner_ptr).astype(np.float64)
+        n = max(len(passages), 1)
+        counts = self.counts
+        dl = np.asarray(counts.sum(axis=1)).ravel()
+        avgdl = float(mult @ dl) / n or 1.0
+        present = counts.copy()
+        present.data[:] = 1.0
+        df = present.T @ mult
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        tf = counts.data
+        text_len = np.repeat(dl, np.diff(counts.indptr))
+        weights = counts.copy()
+        weights.data = self.idf[counts.indices] * tf * (K1 + 1) / (tf + K1 * (1 - B + B * text_len / avgdl))
+        self.postings = sparse.csr_matrix(weights.T, dtype=np.float32)
+        self.df = np.diff(self.postings.indptr)
+        self.max_weight = np.zeros(len(self.vocab), dtype=np.float32)
+        used = self.df > 0
+        if used.any():
+            self.max_weight[used] = np.maximum.reduceat(self.postings.data, self.postings.indptr[:-1][used])
+        # Terms in more texts than this are scored only for candidate texts
+        self.common_df = max(256, len(self.texts) // 20)
+
+    def _tokenize(self, previous: Optional["PassageIndex"]) -> Tuple[Dict[str, int], sparse.csr_matrix]:
+        # Term counts per text; texts the previous index already had are
+        # copied from it, so a KB reload only tokenizes new or edited text
+        if previous is None:
+            vocab: Dict[str, int] = {}
+            return vocab, _count_terms(self.texts, vocab, grow=True)
+        vocab = dict(previous.vocab)
+        reuse = [previous.row.get(t) for t in self.texts]
+        fresh = [t for t, i in zip(self.texts, reuse) if i is None]
+        new_rows = _count_terms(fresh, vocab, grow=True)
+        old_rows = previous.counts.copy()
+        old_rows.resize((old_rows.shape[0], len(vocab)))
+        n_old = old_rows.shape[0]
+        next_new = iter(range(n_old, n_old + len(fresh)))
+        pick = np.fromiter((i if i is not None else next(next_new) for i in reuse), dtype=np.int64, count=len(reuse))
+        return vocab, sparse.vstack([old_rows, new_rows], format="csr")[pick]
+
+    def __len__(self):
+        return len(self.owner_kind)
+
+    def terms(self, query: str) -> np.ndarray:
+        vocab = self.vocab
+        return np.unique(np.fromiter((vocab[t] for t in analyzer()(query) if t in vocab), dtype=np.int64))
+
+    def canonical(self, query: str) -> Tuple[int, ...]:
+        # BM25 here counts each query term once, so the key is the term set
+        return tuple(self.terms(query).tolist())
+
+    def _accumulate(self, terms: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Summed weights of the given terms over every text that has one
+        ptr, idx, data = self.postings.indptr, self.postings.indices, self.postings.data
+        if len(terms) == 1:
+            # One postings row is already unique and sorted
+            span = slice(ptr[terms[0]], ptr[terms[0] + 1])
+            return idx[span], data[span].astype(np.float64)
+        spans = [slice(ptr[t], ptr[t + 1]) for t in terms]
+        ids = np.concatenate([idx[s] for s in spans])
+        w = np.concatenate([data[s] for s in spans]).astype(np.float64)
+        uniq, inv = np.unique(ids, return_inverse=True)
+        return uniq, np.bincount(inv, weights=w, minlength=len(uniq))
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        # Top-k distinct texts as (text id, BM25 score), best first
+        terms = self.terms(query)
+        if not len(terms):
+            return []
+        common = self.df[terms] > self.common_df
+        if common.any() and not common.all():
+            ids, scores = self._accumulate(terms[~common])
+            ptr, idx, data = self.postings.indptr, self.postings.indices, self.postings.data
+            for t in terms[common]:
+                row = idx[ptr[t]:ptr[t + 1]]
+                pos = np.minimum(np.searchsorted(row, ids), len(row) - 1)
+                hit = row[pos] == ids
+                scores[hit] += data[ptr[t] + pos[hit]]
+            top = _top_k(ids, scores, k, min_score)
+            bound = float(self.max_weight[terms[common]].astype(np.float64).sum())
+            if bound < min_score or (len(top) == k and top[-1][1] > bound):
+                return top
+        return _top_k(*self._accumulate(terms), k, min_score)
+
+    def careers_of(self, text_id: int) -> np.ndarray:
+        # Career rows (parents that aren't course skills) of a text's passages
+        lo, hi = self.owner_ptr[text_id], self.owner_ptr[text_id + 1]
+        return self.owner_parent[lo:hi][self.owner_kind[lo:hi] != KINDS.index("course")]
+
+    def owners(self, text_id: int) -> List[Tuple[str, str]]:
+        # (kind, parent) of every passage with this text, in KB order
+        lo, hi = self.owner_ptr[text_id], self.owner_ptr[text_id + 1]
+        return [(KINDS[k], self.parents[p]) for k, p in zip(self.owner_kind[lo:hi].tolist(), self.owner_parent[lo:hi].tolist())]
+
+def kb_passages(careers, courses) -> Tuple[List[Passage], List[str]]:
+    # Career i is parent i (the Q&A index's row order); skills with course
+    # hints follow the careers
+    parents = list(careers)
+    out: List[Passage] = []
+    for i, info in enumerate(careers.values()):
+        out.append(Passage(0, i, info["description"]))
+        out.extend(Passage(1, i, step) for step in info["roadmap"])
+        out.extend(Passage(2, i, skill) for skill in info["skills"])
+    for skill, hints in courses.items():
+        parents.append(skill)
+        out.extend(Passage(3, len(parents) - 1, f"{skill}: {hint}") for hint in hints)
+    return out, parents
+
+def build_passage_index(careers, courses, kb_hash: str = "", previous: Optional[PassageIndex] = None) -> PassageIndex:
+    passages, parents = kb_passages(careers, courses)
+    return PassageIndex(passages, parents, kb_hash, previous)
@@ -0,0 +1,127 @@
+"""Smallest set of skills that qualifies a profile for a group of careers.
+
+Each target career needs `need` more of its missing skills to reach the
+match threshold (all of them at 100%). Requirements are bitsets: one int
+per skill with a bit per target that lists it. Picking a skill lowers the
+need of every open target in its bitset by one. That is a set multicover
+problem. Small instances are solved exactly by branch and bound. Larger
+ones use the greedy rule (most open targets first), which is within a log
+factor of the optimum. benchmarks/check_planner.py checks the exact
+answers against brute force.
+"""
+import heapq
+import math
+from typing import Dict, List, NamedTuple, Sequence, Tuple, Union
+
+# Exact search only below these sizes; the greedy answer is used otherwise
+EXACT_MAX_SKILLS = 40
+NODE_BUDGET = 20000
+
+class Plan(NamedTuple):
+    skills: List[int]            # chosen skill ids, most targets unlocked first
+    unlocks: Dict[int, int]      # skill id → targets bitset it counts towards
+    exact: bool                  # proven minimal (branch and bound finished)
+
+def needs(required: Sequence[Sequence[int]], have: Sequence[Sequence[int]],
+          threshold: Union[float, Sequence[float]]) -> List[int]:
+    # Skills still to learn per target: ceil(threshold * |required|) - |have|,
+    # with one threshold (fraction of the skill list) for all or per target
+    fracs = [threshold] * len(required) if isinstance(threshold, (int, float)) else threshold
+    return [max(0, math.ceil(min(f, 1.0) * len(req) - 1e-9) - len(h)) for req, h, f in zip(required, have, fracs)]
+
+def _bitsets(missing: Sequence[Sequence[int]]) -> Dict[int, int]:
+    bits: Dict[int, int] = {}
+    for t, skills in enumerate(missing):
+        for s in skills:
+            bits[s] = bits.get(s, 0) | (1 << t)
+    return bits
+
+def _greedy(bits: Dict[int, int], need: List[int], order: Dict[int, int]) -> List[int]:
+    # Lazy greedy: a skill's gain (open targets it serves) only shrinks as
+    # targets close, so a stale heap entry is an upper bound and only the
+    # top entry needs re-counting.
+    need = list(need)
+    open_ = sum(1 << t for t, n in enumerate(need) if n > 0)
+    heap = [(-b.bit_count(), -b.bit_count(), order[s], s) for s, b in bits.items()]
+    heapq.heapify(heap)
+    chosen = []
+    while open_ and heap:
+        gain, reach, o, s = heapq.heappop(heap)
+        fresh = (bits[s] & open_).bit_count()
+        if fresh != -gain:
+            if fresh:
+                heapq.heappush(heap, (-fresh, reach, o, s))
+            continue
+        hit = bits[s] & open_
+        chosen.append(s)
+        while hit:
+            low = hit & -hit
+            t = low.bit_length() - 1
+            need[t] -= 1
+            if need[t] == 0:
+                open_ &= ~low
+            hit ^= low
+    return chosen
+
+def _exact(bits: Dict[int, int], need: List[int], best: List[int]) -> Tuple[List[int], bool]:
+    # Depth-first: take the open target with the fewest usable skills and
+    # branch on which of them to learn next (each once, so no permutations).
+    # Lower bound: the largest remaining need, or the total need spread over
+    # the skill that serves the most targets.
+    skills = sorted(bits, key=lambda s: -bits[s].bit_count())
+    best = list(best)
+    nodes = 0
+
+    def dfs(need: List[int], allowed: List[int], chosen: List[int]) -> bool:
+        nonlocal best, nodes
+        nodes += 1
+        if nodes > NODE_BUDGET:
+            return False
+        open_ = [t for t, n in enumerate(need) if n > 0]
+        if not open_:
+            if len(chosen) < len(best):
+                best = list(chosen)
+            return True
+        widest = max((bits[s] & sum(1 << t for t in open_)).bit_count() for s in allowed) if allowed else 0
+        if widest == 0:
+            return True
+        bound = max(max(need), math.ceil(sum(need) / widest))
+        if len(chosen) + bound >= len(best):
+            return True
+        # Most constrained target first
+        usable = {t: [s for s in allowed if bits[s] >> t & 1] for t in open_}
+        t = min(open_, key=lambda t: len(usable[t]) - need[t])
+        if len(usable[t]) < need[t]:
+            return True
+        rest = list(allowed)
+        for s in usable[t]:
+            rest.remove(s)
+            nxt = list(need)
+            for u in open_:
+                if bits[s] >> u & 1:
+                    nxt[u] -= 1
+            if not dfs(nxt, list(rest), chosen + [s]):
+                return False
+        return True
+
+    done = dfs(list(need), skills, [])
+    return best, done
+
+def plan(missing: Sequence[Sequence[int]], need: Sequence[int]) -> Plan:
+    # missing[t]: skill ids target t lacks (in catalog order); need[t]: how
+    # many of them it still requires
+    need = [min(n, len(m)) for n, m in zip(need, missing)]
+    bits = _bitsets([m if n > 0 else () for m, n in zip(missing, need)])
+    order: Dict[int, int] = {}
+    for skills in missing:
+        for s in skills:
+            order.setdefault(s, len(order))
+    chosen = _greedy(bits, need, order)
+    exact = False
+    if chosen and len(bits) <= EXACT_MAX_SKILLS and len(chosen) > max(need):
+        chosen, exact = _exact(bits, need, chosen)
+    elif len(chosen) == max(need, default=0):
+        exact = True  # Greedy already meets the lower bound
+    unlocks = {s: bits[s] for s in chosen}
+    chosen.sort(key=lambda s: (-unlocks[s].bit_count(), order[s]))
+    return Plan(chosen, unlocks, exact)
@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+from typing import List, Dict, Tuple
+import numpy as np
+from scipy import sparse
+
+log = logging.getLogger(__name__)
+
+# Number of times a Q&A index was built or patched in this process
+BUILD_COUNT = 0
+_build_lock = threading.Lock()
+
+def _count_build(kind: str, kb_hash: str, n_docs: int, n_tokenized: int):
+    global BUILD_COUNT
+    with _build_lock:
+        BUILD_COUNT += 1
+        count = BUILD_COUNT
+    log.info("%s Q&A index #%d for kb %s (%d docs, %d tokenized)", kind, count, kb_hash or "?", n_docs, n_tokenized)
+
+def build_count() -> int:
+    return BUILD_COUNT
+
+# -----------------------------
+# TF-IDF index
+# -----------------------------
+@lru_cache(maxsize=None)
+def analyzer():
+    # scikit-learn takes over a second to import, so it is only loaded the
+    # first time a Q&A index is built or queried, not at app startup.
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer(stop_words="english").build_analyzer()
+
+def _count_terms(texts: List[str], vocab: Dict[str, int], grow: bool) -> sparse.csr_matrix:
+    # Raw term counts; unknown terms are added to vocab when grow, else dropped
+    analyze = analyzer()
+    indptr, indices, data = [0], [], []
+    for text in texts:
+        row: Dict[int, int] = {}
+        for tok in analyze(text):
+            j = vocab.setdefault(tok, len(vocab)) if grow else vocab.get(tok)
+            if j is not None:
+                row[j] = row.get(j, 0) + 1
+        indices.extend(row)
+        data.extend(row.values())
+        indptr.append(len(indices))
+    return sparse.csr_matrix((np.asarray(data, dtype=np.float64), indices, indptr), shape=(len(texts), len(vocab)))
+
+def _top_k(ids: np.ndarray, scores: np.ndarray, k: int, min_score: float) -> List[Tuple[int, float]]:
+    # Best k (doc, score) by score; equal scores keep document order
+    keep = scores >= min_score
+    ids, scores = ids[keep], scores[keep]
+    if len(scores) > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+        kth = scores[part].min()
+        keep = scores >= kth
+        ids, scores = ids[keep], scores[keep]
+    order = np.lexsort((ids, -scores))[:k]
+    return [(int(ids[i]), float(scores[i])) for i in order]
+
+def doc_hashes(docs: List[str]) -> np.ndarray:
+    # 64-bit digest per document; updated() compares these instead of
+    # keeping every document's text in memory
+    return np.fromiter((int.from_bytes(hashlib.blake2b(d.encode("utf-8"), digest_size=8).digest(), "little")
+                        for d in docs), dtype=np.uint64, count=len(docs))
+
+class QAIndex:
+    # Same weighting as TfidfVectorizer(stop_words="english") (raw tf, smooth
+    # idf, l2 norm), but the raw term counts are kept per document so a KB
+    # reload only re-tokenizes the documents whose text changed.
+    def __init__(self, docs: List[str], labels: List[str], vocab: Dict[str, int], counts: sparse.csr_matrix, kb_hash: str = ""):
+        self.labels, self.vocab, self.counts, self.kb_hash = labels, vocab, counts, kb_hash
+        self.doc_hash = doc_hashes(docs)
+        n = counts.shape[0]
+        df = np.bincount(counts.indices, minlength=len(vocab))
+        # Terms that no document uses any more are dropped, as a refit would
+        self.idf = np.where(df > 0, np.log((1 + n) / (1 + df)) + 1, 0.0)
+        self.doc_vec = self._weigh(counts)
+        # Inverted index: one row of (doc, weight) postings per term
+        self.postings = sparse.csr_matrix(self.doc_vec.T)
+        self.df = np.diff(self.postings.indptr)
+        self.max_weight = np.zeros(len(vocab))
+        used = self.df > 0
+        if used.any():
+            self.max_weight[used] = np.maximum.reduceat(self.postings.data, self.postings.indptr[:-1][used])
+        # Terms in more docs than this are scored only for candidate docs
+        self.common_df = max(256, n // 20)
+
+    @classmethod
+    def from_arrays(cls, doc_hash: np.ndarray, labels: List[str], vocab: Dict[str, int], counts: sparse.csr_matrix,
+                    idf: np.ndarray, doc_vec: sparse.csr_matrix, postings: sparse.csr_matrix,
+                    max_weight: np.ndarray, kb_hash: str = "") -> "QAIndex":
+        # An index saved by index_store.py, without refitting: the weighted
+        # matrices are used as given (typically read-only memory maps)
+        index = cls.__new__(cls)
+        index.doc_hash, index.labels, index.vocab, index.counts, index.kb_hash = doc_hash, labels, vocab, counts, kb_hash
+        index.idf, index.doc_vec, index.postings, index.max_weight = idf, doc_vec, postings, max_weight
+        index.df = np.diff(postings.indptr)
+        index.common_df = max(256, counts.shape[0] // 20)
+        return index
+
+    def _weigh(self, counts) -> sparse.csr_matrix:
+        m = sparse.csr_matrix(counts @ sparse.diags(self.idf), dtype=np.float64)
+        norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags(1.0 / norms) @ m)
+
+    def transform(self, queries: List[str]) -> sparse.csr_matrix:
+        return self._weigh(_count_terms(queries, self.vocab, grow=False))
+
+    def canonical(self, query: str) -> Tuple[str, ...]:
+        # Scoring only sees the multiset of known, non-stop-word tokens, so
+        # questions differing in case, punctuation or word order share a key.
+        return tuple(sorted(tok for tok in analyzer()(query) if tok in self.vocab))
+
+    def search(self, query: str, k: int = 3, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        # Top-k by cosine similarity, touching only docs that share a term with
+        # the query. Very common terms (template words like "skills" or
+        # "salary") are first scored only on the docs the rarer terms found;
+        # if no other doc could beat the k-th of those (max-score bound),
+        # the full postings of the common terms are never walked.
+        q = self.transform([query])
+        terms, weights = q.indices, q.data
+        common = self.df[terms] > self.common_df
+        if common.any() and not common.all():
+            rare_q = sparse.csr_matrix((weights[~common], terms[~common], [0, int((~common).sum())]), shape=q.shape)
+            cand = rare_q @ self.postings
+            ids = cand.indices
+            scores = cand.data + self.doc_vec[ids][:, terms[common]] @ weights[common]
+            top = _top_k(ids, scores, k, min_score)
+            bound = float(weights[common] @ self.max_weight[terms[common]])
+            if bound < min_score or (len(top) == k and top[-1][1] > bound):
+                return top
+        scores = q @ self.postings
+        return _top_k(scores.indices, scores.data, k, min_score)
+
+    def search_many(self, queries: List[str], k: int = 3, min_score: float = 0.0) -> List[List[Tuple[int, float]]]:
+        # All queries against the inverted index in one sparse product
+        scores = self.transform(queries) @ self.postings
+        return [
+            _top_k(scores.indices[lo:hi], scores.data[lo:hi], k, min_score)
+            for lo, hi in zip(scores.indptr[:-1], scores.indptr[1:])
+        ]
+
+    def updated(self, docs: List[str], labels: List[str], kb_hash: str = "") -> "QAIndex":
+        old = {t: i for i, t in enumerate(self.labels)}
+        reuse = [old.get(t) for t in labels]
+        new_hash = doc_hashes(docs)
+        reuse = [i if i is not None and self.doc_hash[i] == h else None for i, h in zip(reuse, new_hash.tolist())]
+        fresh = [j for j, i in enumerate(reuse) if i is None]
+        vocab = dict(self.vocab)
+        new_rows = _count_terms([docs[j] for j in fresh], vocab, grow=True)
+        old_rows = self.counts.copy()
+        old_rows.resize((old_rows.shape[0], len(vocab)))
+        # Reused rows come from the old counts, re-tokenized ones from new_rows
+        n_old = old_rows.shape[0]
+        pick = np.empty(len(docs), dtype=np.int64)
+        next_new = iter(range(n_old, n_old + len(fresh)))
+        for j, i in enumerate(reuse):
+            pick[j] = i if i is not None else next(next_new)
+        counts = sparse.vstack([old_rows, new_rows], format="csr")[pick]
+        index = QAIndex(docs, labels, vocab, counts, kb_hash)
+        _count_build("Patched", kb_hash, len(docs), len(fresh))
+        return index
+
+def build_qa_index(docs: List[str], labels: List[str], kb_hash: str = "") -> QAIndex:
+    vocab: Dict[str, int] = {}
+    counts = _count_terms(docs, vocab, grow=True)
+    index = QAIndex(docs, labels, vocab, counts, kb_hash)
+    _count_build("Built", kb_hash, len(docs), len(docs))
+    return index
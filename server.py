@@ -0,0 +1,244 @@
+"""Headless JSON API over the advisor core, for portals that don't want the UI.
+
+    python server.py --port 8080 --batch-window-ms 5 --max-batch 64
+
+    POST /recommend  {"name": "...", "skills": ["Python", "SQL"], "interests": "data, ai"}
+    POST /courses    {"recommendations": [...]}  or  {"skills": [...], "interests": [...]}
+    POST /qa         {"question": "What does a Data Engineer do?"}
+    GET  /health
+    GET  /metrics    (Prometheus text format, see metrics.py)
+
+Requests that arrive within the batch window (or until the batch is full)
+are scored together: /recommend through recommend_careers_batch and /qa
+through qa_answer_batch, each a single sparse matrix product. Scoring runs
+in a worker thread so the event loop keeps accepting connections. The
+knowledge base, indexes and hot reload are the ones app.py uses (advisor.py).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import advisor
+from advisor import course_suggestions, courses_for, describe, parse_list, qa_answer_batch, recommend_careers_batch
+from metrics import METRICS, start_exporters
+
+MAX_BODY = 1 << 20
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+# -----------------------------
+# Micro-batching
+# -----------------------------
+class MicroBatcher:
+    # Collects submitted items for up to `window` seconds (or `max_batch`
+    # items) and hands them to `fn` as one list; fn returns one result per item.
+    def __init__(self, fn: Callable[[List[Any]], List[Any]], window: float, max_batch: int):
+        self.fn, self.window, self.max_batch = fn, window, max_batch
+        self.batches = self.items = self.largest = 0
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, item: Any) -> Any:
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((item, fut))
+        if self._task is None:
+            self._full = asyncio.Event()
+            self._task = asyncio.create_task(self._flush())
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return await fut
+
+    async def _flush(self):
+        try:
+            await asyncio.wait_for(self._full.wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        self._task = None
+        if self._pending:
+            # Overflow starts the next window right away
+            self._full = asyncio.Event()
+            self._task = asyncio.create_task(self._flush())
+            if len(self._pending) >= self.max_batch:
+                self._full.set()
+        self.batches, self.items = self.batches + 1, self.items + len(batch)
+        self.largest = max(self.largest, len(batch))
+        try:
+            results = await asyncio.to_thread(self.fn, [item for item, _ in batch])
+        except Exception as exc:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        for (_, fut), res in zip(batch, results):
+            if not fut.done():
+                fut.set_result(res)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"batches": self.batches, "items": self.items, "largest": self.largest,
+                "mean": self.items / self.batches if self.batches else 0.0,
+                "window_ms": self.window * 1e3, "max_batch": self.max_batch}
+
+# -----------------------------
+# Endpoints
+# -----------------------------
+def _items(body: Dict, key: str) -> List[str]:
+    # Lists or the form's comma-separated text are both accepted
+    value = body.get(key) or []
+    if isinstance(value, str):
+        return parse_list(value)
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise HTTPError(400, f"'{key}' must be a list of strings or a comma-separated string")
+    return value
+
+class Service:
+    def __init__(self, window: float, max_batch: int):
+        self.started = time.time()
+        self.recommend = MicroBatcher(recommend_careers_batch, window, max_batch)
+        self.qa = MicroBatcher(qa_answer_batch, window, max_batch)
+
+    async def handle(self, method: str, path: str, body: Dict) -> Union[Dict, str]:
+        route = (method, path.split("?", 1)[0].rstrip("/") or "/")
+        if route == ("GET", "/health"):
+            return self.health()
+        if route == ("GET", "/metrics"):
+            return METRICS.prometheus()
+        if route == ("POST", "/recommend"):
+            recs = await self.recommend.submit((_items(body, "skills"), _items(body, "interests")))
+            return {"name": body.get("name", ""), "recommendations": describe(recs)}
+        if route == ("POST", "/courses"):
+            recs = body.get("recommendations")
+            if recs is None:
+                recs = await self.recommend.submit((_items(body, "skills"), _items(body, "interests")))
+                return {"courses": dict(course_suggestions(recs))}
+            if not isinstance(recs, list) or not all(isinstance(r, dict) and "skills_missed" in r for r in recs):
+                raise HTTPError(400, "'recommendations' must be a list of objects with 'skills_missed'")
+            return {"courses": courses_for(s for r in recs for s in r["skills_missed"])}
+        if route == ("POST", "/qa"):
+            question = body.get("question")
+            if not isinstance(question, str) or not question.strip():
+                raise HTTPError(400, "'question' must be a non-empty string")
+            answer, title, conf = await self.qa.submit(question)
+            return {"answer": answer, "career": title, "confidence": conf}
+        if route[1] in ("/health", "/metrics", "/recommend", "/courses", "/qa"):
+            raise HTTPError(405, f"{method} not allowed on {route[1]}")
+        raise HTTPError(404, f"No route for {path}")
+
+    def health(self) -> Dict:
+        idx = advisor.current_indexes()
+        return {
+            "status": "ok", "uptime_s": round(time.time() - self.started, 3),
+            "kb_version": idx.kb.version, "careers": len(idx.kb.careers), "qa_ready": idx.qa is not None,
+            "batching": {"recommend": self.recommend.stats(), "qa": self.qa.stats()},
+            "index_builds": advisor.index_builds(),
+            "qa_cache": advisor.QA_CACHE.stats(),
+            "result_cache": advisor.RESULT_CACHE.stats(),
+        }
+
+# -----------------------------
+# HTTP/1.1 over asyncio streams
+# -----------------------------
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        k, _, v = h.decode("latin-1").partition(":")
+        headers[k.strip().lower()] = v.strip()
+    raw = headers.get("content-length") or "0"
+    # Digits only: int() would also take "-5", "+5" or " 5_0"
+    if not (raw.isascii() and raw.isdigit()):
+        raise HTTPError(400, "Malformed Content-Length")
+    length = int(raw)
+    if length > MAX_BODY:
+        raise HTTPError(413, f"Body larger than {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+def _response(status: int, payload: Union[Dict, str], keep_alive: bool) -> bytes:
+    # Text payloads are the Prometheus exposition; everything else is JSON
+    if isinstance(payload, str):
+        data, ctype = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        data, ctype = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: {ctype}\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + data
+
+def make_handler(service: Service):
+    async def handle_conn(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    req = await _read_request(reader)
+                    if req is None:
+                        break
+                    method, path, headers, raw = req
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    try:
+                        body = json.loads(raw) if raw.strip() else {}
+                    except ValueError:
+                        raise HTTPError(400, "Body is not valid JSON")
+                    if not isinstance(body, dict):
+                        raise HTTPError(400, "Body must be a JSON object")
+                    status, payload = 200, await service.handle(method, path, body)
+                except HTTPError as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as exc:
+                    status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+    return handle_conn
+
+async def serve(host: str, port: int, window: float, max_batch: int):
+    service = Service(window, max_batch)
+    server = await asyncio.start_server(make_handler(service), host, port)
+    # The Q&A index isn't needed for /recommend; build it off the loop
+    asyncio.get_running_loop().run_in_executor(None, advisor.qa_indexes)
+    print(f"Serving on http://{host}:{port} (batch window {window * 1e3:g} ms, max batch {max_batch})",
+          file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Serve the career advisor as a JSON HTTP API.")
+    p.add_argument("--host", default=os.environ.get("ADVISOR_HOST", "127.0.0.1"))
+    p.add_argument("--port", type=int, default=int(os.environ.get("ADVISOR_PORT", 8080)))
+    p.add_argument("--batch-window-ms", type=float, default=float(os.environ.get("ADVISOR_BATCH_WINDOW_MS", 5)),
+                   help="How long to hold requests to score them together (default 5)")
+    p.add_argument("--max-batch", type=int, default=int(os.environ.get("ADVISOR_MAX_BATCH", 64)),
+                   help="Flush a batch as soon as it has this many requests (default 64)")
+    args = p.parse_args(argv)
+    start_exporters()
+    try:
+        asyncio.run(serve(args.host, args.port, args.batch_window_ms / 1e3, max(1, args.max_batch)))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+# Common abbreviations and alternate spellings → canonical skill (normalized).
+# Aliases whose target isn't in the loaded KB are ignored.
+ALIASES: Dict[str, str] = {
+    "ml": "machine learning",
+    "dl": "deep learning", "natural language processing": "nlp",
+    "py": "python", "python3": "python", "python 3": "python",
+    "k8s": "kubernetes", "kube": "kubernetes",
+    "postgres": "sql", "postgresql": "sql", "postgres sql": "sql", "mysql": "sql", "sqlite": "sql",
+    "tsql": "sql", "t sql": "sql", "pl/sql": "sql", "sql server": "sql",
+    "js": "javascript", "es6": "javascript", "ecmascript": "javascript",
+    "node": "node.js", "nodejs": "node.js", "reactjs": "react", "react.js": "react", "rn": "react native",
+    "tf": "tensorflow", "torch": "pytorch",
+    "amazon web services": "aws", "google cloud": "gcp", "google cloud platform": "gcp", "microsoft azure": "azure",
+    "ci cd": "ci/cd", "cicd": "ci/cd", "continuous integration": "ci/cd",
+    "stats": "statistics", "dataviz": "data visualization", "data viz": "data visualization",
+    "tableau": "data visualization", "power bi": "data visualization", "powerbi": "data visualization",
+    "ms excel": "excel", "microsoft excel": "excel", "spreadsheets": "excel",
+    "cpp": "c++", "csharp": "c#", "c sharp": "c#",
+    "system architecture": "system design", "ux research": "user research", "xd": "adobe xd",
+    "ab testing": "a/b testing", "a/b tests": "a/b testing", "split testing": "a/b testing",
+    "pyspark": "spark", "apache spark": "spark", "hadoop": "big data",
+    "pentesting": "ethical hacking", "penetration testing": "ethical hacking",
+    "eth": "ethereum", "rest": "apis", "rest api": "apis", "rest apis": "apis",
+    "db": "databases", "dbms": "databases", "rdbms": "databases",
+    "bash": "scripting", "shell": "scripting", "shell scripting": "scripting",
+    "adwords": "google ads", "unity3d": "unity", "blender": "3d modeling",
+}
+
+# Skill domains for the career filters (normalized skills). A skill can sit
+# in several domains; a career belongs to the domain(s) most of its skills
+# are in. Skills not listed here don't count towards any domain.
+DOMAINS: Dict[str, List[str]] = {
+    "Cloud & DevOps": ["linux", "aws", "azure", "gcp", "gcp core", "docker", "kubernetes", "ci/cd",
+                       "scripting", "networking", "terraform"],
+    "Data & AI": ["python", "sql", "statistics", "machine learning", "ml basics", "deep learning", "nlp",
+                  "tensorflow", "pytorch", "data visualization", "etl", "big data", "spark", "data pipelines",
+                  "gcp vertex ai", "analytics", "a/b testing", "excel"],
+    "Software Development": ["python", "java", "c++", "c#", "javascript", "react", "node.js", "apis", "databases",
+                             "system design", "flutter", "react native", "kotlin", "swift", "solidity",
+                             "ethereum", "smart contracts", "manual testing", "automation testing", "selenium",
+                             "jmeter"],
+    "Security": ["ethical hacking", "security tools", "risk management", "cryptography", "networking"],
+    "Design & Creative": ["figma", "adobe xd", "creativity", "user research", "game design", "3d modeling",
+                          "unity", "arkit", "arcore"],
+    "Business & Product": ["excel", "problem solving", "communication", "business strategy", "agile",
+                           "market research", "product metrics", "a/b testing", "sql"],
+    "Marketing": ["seo", "google ads", "content marketing", "analytics"],
+    "IT Support": ["troubleshooting", "customer support", "windows/linux", "networking"],
+}
+
+_SEP = re.compile(r"[\s_\-]+")
+
+def skill_key(text: str) -> str:
+    # "Machine-Learning " / "machine_learning" → "machine learning"
+    return _SEP.sub(" ", text.strip().lower()).strip()
+
+def _grams(key: str) -> List[str]:
+    padded = f"  {key} "
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+class SkillResolver:
+    # Maps free-text skills to canonical (normalized) KB skills: exact and
+    # spacing/hyphen variants first, then the alias table, then the closest
+    # name by character-trigram Dice similarity from an inverted n-gram index.
+    def __init__(self, names: Iterable[str], display: Optional[Dict[str, str]] = None,
+                 aliases: Dict[str, str] = ALIASES, min_similarity: float = 0.6):
+        self.names = list(names)
+        self.display = display or {}
+        self.min_similarity = min_similarity
+        self.exact: Dict[str, str] = {}
+        for name in self.names:
+            for k in (name, skill_key(name), skill_key(name).replace(" ", "")):
+                self.exact.setdefault(k, name)
+        known = set(self.names)
+        for alias, target in aliases.items():
+            if target in known:
+                self.exact.setdefault(skill_key(alias), target)
+                self.exact.setdefault(skill_key(alias).replace(" ", ""), target)
+        # Trigram ids per name (CSR layout) and the inverted index gram → names
+        self.gram_ids: Dict[str, int] = {}
+        ptr, flat = [0], []
+        for name in self.names:
+            flat.extend(sorted(self.gram_ids.setdefault(g, len(self.gram_ids)) for g in _grams(skill_key(name))))
+            ptr.append(len(flat))
+        self.name_ptr = np.asarray(ptr, dtype=np.int64)
+        self.name_grams = np.asarray(flat, dtype=np.int32)
+        self.sizes = np.diff(self.name_ptr).astype(np.float64)
+        order = np.argsort(self.name_grams, kind="stable")
+        owners = np.repeat(np.arange(len(self.names), dtype=np.int32), np.diff(self.name_ptr))
+        self.post_names = owners[order]
+        self.post_ptr = np.searchsorted(self.name_grams[order], np.arange(len(self.gram_ids) + 1))
+        self._ptr = self.post_ptr.tolist()
+        self._resolve = lru_cache(maxsize=65536)(self._lookup)
+
+    # Candidates come from the query's rarest trigrams, up to this many postings
+    PROBE_BUDGET = 256
+
+    def _lookup(self, text: str) -> Optional[str]:
+        key = skill_key(text)
+        hit = self.exact.get(key) or self.exact.get(key.replace(" ", ""))
+        if hit or len(key) < 4:
+            # Too short to fuzz reliably; short forms go through ALIASES
+            return hit
+        qids = [self.gram_ids[g] for g in _grams(key) if g in self.gram_ids]
+        if not qids:
+            return None
+        na = len(_grams(key))
+        ptr = self._ptr
+        # A typo only breaks the few grams around it, so a close match shares
+        # some of the query's rarest grams. Candidates come from those, within
+        # a postings budget; common grams ("ing", " da") are then only checked
+        # for the candidates, by binary search in their sorted postings.
+        qids.sort(key=lambda g: ptr[g + 1] - ptr[g])
+        n_probe, used = 0, 0
+        for g in qids:
+            size = ptr[g + 1] - ptr[g]
+            if n_probe and used + size > self.PROBE_BUDGET:
+                break
+            n_probe, used = n_probe + 1, used + size
+        cands, common = np.unique(
+            np.concatenate([self.post_names[ptr[g]:ptr[g + 1]] for g in qids[:n_probe]]), return_counts=True)
+        # Drop candidates that can't reach the threshold even if they share
+        # every unchecked gram
+        sizes = self.sizes[cands]
+        keep = 2.0 * (common + (len(qids) - n_probe)) >= self.min_similarity * (na + sizes)
+        if not keep.all():
+            cands, common, sizes = cands[keep], common[keep], sizes[keep]
+            if not len(cands):
+                return None
+        for g in qids[n_probe:]:
+            seg = self.post_names[ptr[g]:ptr[g + 1]]
+            pos = np.minimum(np.searchsorted(seg, cands), len(seg) - 1)
+            common += seg[pos] == cands
+        dice = 2.0 * common / (na + sizes)
+        for best in np.argsort(-dice, kind="stable"):
+            if dice[best] < self.min_similarity:
+                break
+            name = self.names[cands[best]]
+            if self._typo_of(key, skill_key(name)):
+                return name
+        return None
+
+    @staticmethod
+    def _typo_of(key: str, name: str) -> bool:
+        # Fuzzy matching only fixes typos: a generic word isn't stretched into
+        # a longer skill that contains it ("design" → "game design"), and the
+        # lengths must be within a few edits of each other
+        if f" {key} " in f" {name} ":
+            return False
+        return abs(len(name) - len(key)) <= max(2, min(len(key), len(name)) // 4)
+
+    def resolve(self, text: str) -> Optional[str]:
+        return self._resolve(text)
+
+    def resolve_all(self, items: List[str]) -> List[str]:
+        # Unknown items are kept (normalized) so they still count as "typed"
+        out = []
+        for item in items:
+            if isinstance(item, str) and item.strip():
+                out.append(self._resolve(item) or item.strip().lower())
+        return out
+
+    def explain(self, items: List[str]) -> List[Tuple[str, str]]:
+        # (typed, canonical display name) for items that were rewritten
+        out = []
+        for item in items:
+            hit = self._resolve(item) if isinstance(item, str) and item.strip() else None
+            if hit and hit != item.strip().lower():
+                out.append((item.strip(), self.display.get(hit, hit)))
+        return out